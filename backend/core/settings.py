@@ -14,6 +14,7 @@ import os
 import secrets
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -187,3 +188,62 @@ REST_FRAMEWORK = {
 # Firebase Configuration
 FIREBASE_SERVICE_ACCOUNT_PATH = os.environ.get('FIREBASE_SERVICE_ACCOUNT_PATH', '')
 FIREBASE_SERVICE_ACCOUNT_JSON = os.environ.get('FIREBASE_SERVICE_ACCOUNT_JSON', '')
+
+# Market Simulation
+# Precomputed trajectory bank (see `manage.py build_trajectory_bank`).
+# Sessions fall back to live generation when the file doesn't exist.
+MARKET_TRAJECTORY_BANK = os.environ.get(
+    'MARKET_TRAJECTORY_BANK',
+    str(BASE_DIR / 'game_engine' / 'ml' / 'data' / 'trajectory_bank.npy'),
+)
+
+# Stock model inference
+# One intra-op thread per gunicorn worker avoids oversubscribing the CPU;
+# raise it for single-process deployments.
+TORCH_NUM_THREADS = int(os.environ.get('TORCH_NUM_THREADS', '1'))
+# Trace the LSTM into a frozen TorchScript graph at load time
+STOCK_MODEL_COMPILE = os.environ.get('STOCK_MODEL_COMPILE', 'True').lower() == 'true'
+# Dynamic int8 quantization of the LSTM/Linear weights (opt-in; validate
+# drift first with `manage.py validate_quantized_model`)
+STOCK_MODEL_QUANTIZE = os.environ.get('STOCK_MODEL_QUANTIZE', 'False').lower() == 'true'
+# Concurrent forecast requests are collected for this long and run as one
+# batched rollout (0 runs each request inline)
+STOCK_FORECAST_BATCH_WINDOW_MS = float(os.environ.get('STOCK_FORECAST_BATCH_WINDOW_MS', '5'))
+STOCK_FORECAST_MAX_BATCH = int(os.environ.get('STOCK_FORECAST_MAX_BATCH', '64'))
+# Rollouts allowed to run at once per worker process
+STOCK_INFERENCE_CONCURRENCY = int(os.environ.get('STOCK_INFERENCE_CONCURRENCY', '1'))
+# Out-of-process model server (`manage.py run_model_server`): a Unix socket
+# path or host:port. Empty runs the model inside each web worker.
+STOCK_MODEL_SERVER = os.environ.get('STOCK_MODEL_SERVER', '')
+# Must be identical for the server and every worker, so it is never derived
+# from SECRET_KEY (a random per-process value when unset)
+STOCK_MODEL_SERVER_AUTHKEY = os.environ.get('STOCK_MODEL_SERVER_AUTHKEY', '')
+if STOCK_MODEL_SERVER and not STOCK_MODEL_SERVER_AUTHKEY:
+    raise ImproperlyConfigured("STOCK_MODEL_SERVER is set; set STOCK_MODEL_SERVER_AUTHKEY as well.")
+STOCK_MODEL_SERVER_TIMEOUT = float(os.environ.get('STOCK_MODEL_SERVER_TIMEOUT', '10'))
+# Load and warm the in-process model at startup (set False for one-off
+# management commands such as migrate)
+STOCK_MODEL_PRELOAD = os.environ.get('STOCK_MODEL_PRELOAD', 'True').lower() == 'true'
+# Share the noise-free model rollout for a seed window across sessions via
+# the Django cache; each session only layers its own chaos on top. Only used
+# with MARKET_SEED_WINDOW='latest': random windows rarely repeat, and the
+# shared path feeds the model no noise, which changes the market dynamics
+STOCK_FORECAST_CACHE = os.environ.get('STOCK_FORECAST_CACHE', 'True').lower() == 'true'
+STOCK_FORECAST_CACHE_TIMEOUT = int(os.environ.get('STOCK_FORECAST_CACHE_TIMEOUT', str(60 * 60 * 24)))
+# Seed window for new sessions' stock model: 'random' picks any valid
+# 60-day window of history, 'latest' always uses the most recent one
+MARKET_SEED_WINDOW = os.environ.get('MARKET_SEED_WINDOW', 'random')
+# Seconds before a worker reloads its in-memory MarketTickerData index
+MARKET_WINDOW_INDEX_TTL = int(os.environ.get('MARKET_WINDOW_INDEX_TTL', '3600'))
+# Memory cap for loaded stock models per process; least recently used
+# tickers are evicted beyond it
+STOCK_MODEL_CACHE_MB = int(os.environ.get('STOCK_MODEL_CACHE_MB', '256'))
+# Seconds a ticker whose model files failed to load is served as GBM
+# before the registry tries loading it again
+STOCK_MODEL_RETRY_SECONDS = int(os.environ.get('STOCK_MODEL_RETRY_SECONDS', '300'))
+# Seconds a session's chart history stays cached; entries are per
+# (session, current month), so they never go stale, only unused
+MARKET_HISTORY_CACHE_TIMEOUT = int(os.environ.get('MARKET_HISTORY_CACHE_TIMEOUT', str(60 * 60)))
+# Seconds a trade or month advance waits for a new session's background
+# market generation before generating it inline
+MARKET_READY_WAIT = float(os.environ.get('MARKET_READY_WAIT', '5'))
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,14 +12,24 @@ class GameEngineConfig(AppConfig):
         """Initialize Firebase when Django starts."""
         # Import here to avoid AppRegistryNotReady error
         from .firebase_auth import initialize_firebase
+        from . import signals  # noqa: F401 - keeps the session income counters current
         
         # Initialize Firebase (with built-in duplicate check)
         initialize_firebase()
         
-        # Preload AI Models
+        # Preload AI Models (pins torch threads, compiles and warms up the model).
+        # Skipped when a model server owns the model - workers never load torch.
+        if settings.STOCK_MODEL_SERVER or not settings.STOCK_MODEL_PRELOAD:
+            return
         try:
+            from .ml.inference import configure_torch_threads
             from .ml.predictor import AIStockPredictor
-            AIStockPredictor.preload_model('RELIANCE')
+            from .ml.registry import has_model
+            from .services.config import GameEngineConfig as GameConfig
+            configure_torch_threads()
+            for ticker in GameConfig.CONFIG['SECTOR_MODELS'].values():
+                if has_model(ticker):
+                    AIStockPredictor.warmup(ticker)
         except ImportError:
             pass # Handle case where deps aren't ready yet (e.g. during migration)
         except Exception as e:
@@ -0,0 +1,57 @@
+"""
+Minimal in-process background worker.
+
+The deployment has no task queue (plain gunicorn workers), so work that
+must not block a request - e.g. generating the next chunk of a session's
+market history - runs on a small per-process thread pool instead.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='game-bg')
+    return _executor
+
+
+def submit(fn, *args, key=None, **kwargs):
+    """
+    Run fn(*args, **kwargs) on the background pool once the current
+    transaction commits (immediately when in autocommit mode).
+
+    If `key` is given, a job with the same key that is still queued or
+    running is not submitted twice.
+    """
+    if key is not None:
+        with _executor_lock:
+            if key in _pending:
+                return
+            _pending.add(key)
+
+    def run():
+        close_old_connections()
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            logger.exception("Background job %s failed", key or getattr(fn, '__name__', fn))
+        finally:
+            # Each pool thread owns its own DB connection; don't leak it
+            close_old_connections()
+            if key is not None:
+                with _executor_lock:
+                    _pending.discard(key)
+
+    transaction.on_commit(lambda: _get_executor().submit(run))
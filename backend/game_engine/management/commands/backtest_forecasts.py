@@ -0,0 +1,166 @@
+"""
+Benchmark and backtest for the market forecast engines.
+
+Runs each engine from historical MarketTickerData seed windows and
+reports speed and memory. It also compares the distribution of
+simulated monthly returns with real history over the same horizon:
+volatility, max drawdown and lag-1 autocorrelation.
+"""
+import random
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from game_engine.ml import client as forecast_client
+from game_engine.ml.predictor import AIStockPredictor
+from game_engine.ml.seed_windows import SeedWindowIndex
+from game_engine.ml.simulator import MarketSimulator
+from game_engine.ml.trajectory_bank import TrajectoryBank
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks forecast engines and backtests their return statistics against history'
+
+    ENGINES = ('gbm', 'lstm', 'lstm_many', 'lstm_cached', 'bank')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', default='RELIANCE', help='Model ticker; seed data is <ticker>.NS')
+        parser.add_argument('--months', type=int, default=60)
+        parser.add_argument('--windows', type=int, default=16, help='Historical seed windows to sample')
+        parser.add_argument('--batch-sizes', default='1,16,64', help='Batch sizes for batched engines')
+        parser.add_argument('--engines', default=','.join(self.ENGINES))
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        ticker = options['ticker'].upper()
+        months = options['months']
+        batch_sizes = [int(b) for b in options['batch_sizes'].split(',')]
+        rng = random.Random(options['seed'])
+
+        index = SeedWindowIndex.for_ticker(f'{ticker}.NS')
+        if not len(index):
+            raise CommandError(f"No seed windows for {ticker}.NS in MarketTickerData.")
+        windows = [index.random_window(rng) for _ in range(options['windows'])]
+        predictor = AIStockPredictor(ticker)
+
+        engines = {
+            # name: (fn(windows) -> (n, months) prices, batched)
+            'gbm': (lambda ws: self._gbm(ws, months, rng), True),
+            'lstm': (lambda ws: np.array([
+                predictor.generate_forecast(w, months=months, rng=rng) for w in ws
+            ], dtype=np.float64), False),
+            'lstm_many': (lambda ws: np.array(
+                predictor.generate_forecast_many(ws, months=months, rngs=[rng] * len(ws))[0], dtype=np.float64
+            ), True),
+            'lstm_cached': (lambda ws: np.array([
+                forecast_client.cached_forecast(ticker, w, w[-1, 0], months, rng=rng.getrandbits(32))[0]
+                for w in ws
+            ], dtype=np.float64), False),
+            'bank': (lambda ws: self._bank(ws, months, rng), True),
+        }
+        selected = [e for e in options['engines'].split(',') if e in engines]
+        if predictor.model is None:
+            selected = [e for e in selected if not e.startswith('lstm')]
+            self.stdout.write(self.style.WARNING(f"No model for {ticker}; skipping LSTM engines."))
+
+        self.stdout.write(
+            f"{options['windows']} seed windows of {ticker}.NS, {months}-month trajectories\n\n"
+            f"{'engine':<13}{'batch':>6}{'traj/s':>10}{'ms/traj':>10}{'peak MiB':>10}"
+            f"{'vol':>9}{'max DD':>9}{'AC(1)':>8}"
+        )
+        for name in selected:
+            fn, batched = engines[name]
+            for batch in (batch_sizes if batched else [1]):
+                batch_windows = [windows[i % len(windows)] for i in range(batch if batched else len(windows))]
+                try:
+                    paths, elapsed, peak = self._measure(fn, batch_windows)
+                except _Unavailable as e:
+                    self.stdout.write(f"{name:<13}{'-':>6}  {e}")
+                    break
+                starts = np.array([w[-1, 0] for w in batch_windows])[:, None]
+                stats = self._path_stats(np.hstack([starts, paths]))
+                self.stdout.write(
+                    f"{name:<13}{batch:>6}{len(paths) / elapsed:>10.1f}{elapsed / len(paths) * 1000:>10.2f}"
+                    f"{peak / 2 ** 20:>10.1f}" + self._format_stats(stats)
+                )
+
+        real = self._path_stats(self._real_paths(index.features[:, 0], months))
+        self.stdout.write(f"{'history':<13}{'':>6}{'':>10}{'':>10}{'':>10}" + self._format_stats(real))
+        self.stdout.write(
+            "\nvol: std of monthly returns; max DD: mean worst peak-to-trough; AC(1): lag-1 autocorrelation.\n"
+            "Peak MiB counts Python/NumPy allocations (tracemalloc, measured on a second, untimed pass;\n"
+            "lstm_cached's second pass reuses the paths cached by the first); torch tensors are not included."
+        )
+
+    @staticmethod
+    def _measure(fn, windows):
+        """
+        Time one pass with tracemalloc off (its allocation hooks would
+        inflate the timings), then trace a second pass for peak memory.
+        Paths come from the timed pass.
+        """
+        started = time.perf_counter()
+        paths = fn(windows)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        try:
+            fn(windows)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return paths, elapsed, peak
+
+    @staticmethod
+    def _gbm(windows, months, rng):
+        """The single-asset fallback (_fallback_generator), all windows in one draw."""
+        simulator = MarketSimulator(['price'], drift=[0.005], volatility=[0.05])
+        paths = simulator.prices([1.0], months, n=len(windows), rng=rng.getrandbits(32))[..., 0]
+        return paths * np.array([w[-1, 0] for w in windows])[:, None]
+
+    @staticmethod
+    def _bank(windows, months, rng):
+        bank = TrajectoryBank.load()
+        if bank is None or not bank.covers(['tech'], months):
+            raise _Unavailable("no trajectory bank (manage.py build_trajectory_bank)")
+        if bank.starts is None:
+            raise _Unavailable("bank has no start prices; rebuild it (manage.py build_trajectory_bank)")
+        rows = [rng.randrange(bank.count) for _ in windows]
+        column = bank.assets.index('tech')
+        paths = np.asarray(bank.prices[rows, :months, column], dtype=np.float64)
+        # Rescale each row from its own start price to the window's close, keeping month 1's return
+        starts = np.asarray(bank.starts[rows, column], dtype=np.float64)[:, None]
+        return paths / starts * np.array([w[-1, 0] for w in windows])[:, None]
+
+    @staticmethod
+    def _real_paths(closes, months, days_per_month=20):
+        """Every month-aligned stretch of `months` months of real closes, as (n, months + 1) paths."""
+        span = months * days_per_month
+        starts = range(0, len(closes) - span, days_per_month)
+        return np.array([closes[s:s + span + 1:days_per_month] for s in starts])
+
+    @staticmethod
+    def _path_stats(paths):
+        """Mean per-path volatility, max drawdown and lag-1 autocorrelation of monthly returns."""
+        paths = np.maximum(paths, 1e-9)
+        returns = paths[:, 1:] / paths[:, :-1] - 1
+        drawdown = 1 - paths / np.maximum.accumulate(paths, axis=1)
+
+        centered = returns - returns.mean(axis=1, keepdims=True)
+        denom = (centered ** 2).sum(axis=1)
+        autocorr = np.divide(
+            (centered[:, 1:] * centered[:, :-1]).sum(axis=1), denom,
+            out=np.zeros(len(paths)), where=denom > 0,
+        )
+        return returns.std(axis=1).mean(), drawdown.max(axis=1).mean(), autocorr.mean()
+
+    @staticmethod
+    def _format_stats(stats):
+        vol, drawdown, autocorr = stats
+        return f"{vol:>9.2%}{drawdown:>9.1%}{autocorr:>8.2f}"
+
+
+class _Unavailable(Exception):
+    pass
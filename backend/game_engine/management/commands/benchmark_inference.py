@@ -0,0 +1,89 @@
+"""
+Microbenchmark: eager vs TorchScript-compiled StockPredictor latency on CPU.
+"""
+import random
+import time
+
+import numpy as np
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from game_engine.ml.inference import CompiledStockPredictor, configure_torch_threads
+from game_engine.ml.predictor import AIStockPredictor
+from game_engine.ml.registry import has_model, model_paths
+
+
+class Command(BaseCommand):
+    help = 'Compares eager vs compiled StockPredictor inference latency on CPU'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', default='RELIANCE')
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--months', type=int, default=12, help='Forecast length for the end-to-end timing')
+
+    def handle(self, *args, **options):
+        configure_torch_threads()
+        ticker = options['ticker'].upper()
+        iterations = options['iterations']
+
+        if not has_model(ticker):
+            raise CommandError(f"No trained model files for {ticker}.")
+        model_path, _ = model_paths(ticker)
+
+        # Built exactly as AIStockPredictor loads them (settings.STOCK_MODEL_QUANTIZE applies to both)
+        eager = AIStockPredictor.load_model(model_path, compile=False)
+        compile_started = time.perf_counter()
+        compiled = AIStockPredictor.load_model(model_path, compile=True)
+        if not isinstance(compiled, CompiledStockPredictor):
+            raise CommandError("Compilation failed (see the log); nothing to compare.")
+        compiled.warmup()
+        self.stdout.write(f"Compile + warmup: {(time.perf_counter() - compile_started) * 1000:.1f} ms")
+        self.stdout.write(f"torch threads: {torch.get_num_threads()}\n")
+
+        window = torch.randn(1, 60, 5)
+        row = torch.randn(1, 1, 5)
+        with torch.no_grad():
+            _, eager_state = eager.step(window)
+        _, compiled_state = compiled.step(window)
+
+        cases = [
+            ('60-step window', lambda: eager.step(window), lambda: compiled.step(window)),
+            ('1-step incremental', lambda: eager.step(row, eager_state), lambda: compiled.step(row, compiled_state)),
+        ]
+
+        self.stdout.write(f"{'case':<22}{'eager p50':>12}{'compiled p50':>15}{'eager p95':>12}{'compiled p95':>15}{'speedup':>10}")
+        for name, run_eager, run_compiled in cases:
+            with torch.no_grad():
+                eager_times = self._time(run_eager, iterations)
+            compiled_times = self._time(run_compiled, iterations)
+            self.stdout.write(
+                f"{name:<22}"
+                f"{np.percentile(eager_times, 50):>10.1f}us"
+                f"{np.percentile(compiled_times, 50):>13.1f}us"
+                f"{np.percentile(eager_times, 95):>10.1f}us"
+                f"{np.percentile(compiled_times, 95):>13.1f}us"
+                f"{np.median(eager_times) / np.median(compiled_times):>9.2f}x"
+            )
+
+        # End-to-end forecast through AIStockPredictor with each model
+        predictor = AIStockPredictor(ticker)
+        if predictor.scaler is None:
+            return
+        seed = np.tile(predictor.scaler.inverse_transform(np.zeros((1, 5))), (60, 1))
+        for label, model in (('eager', eager), ('compiled', compiled)):
+            predictor.model = model
+            started = time.perf_counter()
+            predictor.generate_forecast(seed, months=options['months'], rng=random.Random(0))
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{options['months']}-month forecast ({label}): {elapsed:.1f} ms")
+
+    @staticmethod
+    def _time(fn, iterations):
+        for _ in range(10):
+            fn()
+        times = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - started) * 1e6)
+        return np.array(times)
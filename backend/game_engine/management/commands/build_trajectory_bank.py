@@ -0,0 +1,83 @@
+"""
+Pre-generates multi-sector market trajectories into a memory-mapped bank.
+Session start then samples a row instead of running the forecast models.
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game_engine.ml.predictor import AIStockPredictor
+from game_engine.ml.registry import has_model
+from game_engine.ml.seed_windows import SeedWindowIndex
+from game_engine.ml.simulator import MarketSimulator
+from game_engine.ml.trajectory_bank import TrajectoryBank
+from game_engine.services.config import GameEngineConfig
+
+
+class Command(BaseCommand):
+    help = 'Pre-generates market trajectories into a memory-mapped .npy bank'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20000, help='Number of trajectories')
+        parser.add_argument('--months', type=int, default=GameEngineConfig.CONFIG['GAME_DURATION_MONTHS'])
+        parser.add_argument('--batch-size', type=int, default=1024, help='Trajectories per batched LSTM rollout')
+        parser.add_argument('--seed', type=int, default=None, help='RNG seed for a reproducible bank')
+        parser.add_argument('--output', default=settings.MARKET_TRAJECTORY_BANK)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        months = options['months']
+        batch_size = options['batch_size']
+        rng = np.random.default_rng(options['seed'])
+        sectors = GameEngineConfig.CONFIG['STOCK_SECTORS']
+
+        # Sectors with a trained model and seed data roll out their LSTM; the rest use GBM
+        models = {}
+        for sector in sectors:
+            ticker = GameEngineConfig.CONFIG['SECTOR_MODELS'].get(sector)
+            if not ticker or not has_model(ticker):
+                continue
+            index = SeedWindowIndex.for_ticker(f'{ticker}.NS')
+            if not len(index):
+                self.stdout.write(self.style.WARNING(f"No seed data for {ticker}; {sector} uses GBM."))
+                continue
+            models[sector] = (AIStockPredictor(ticker), index)
+
+        writer = TrajectoryBank.create(options['output'], sectors, count, months)
+        self.stdout.write(f"Generating {count} x {months}-month trajectories for {', '.join(sectors)}...")
+
+        started = time.perf_counter()
+        simulator = MarketSimulator.from_config(GameEngineConfig.CONFIG)
+        start_prices = [
+            GameEngineConfig.CONFIG['SECTOR_START_PRICES'].get(asset, 100) for asset in simulator.assets
+        ]
+
+        for offset in range(0, count, batch_size):
+            n = min(batch_size, count - offset)
+            # Correlated GBM for every sector in one draw; model sectors are then replaced by the LSTM
+            simulated = simulator.prices(start_prices, months, n=n, rng=rng)
+            for column, sector in enumerate(sectors):
+                if sector in models:
+                    predictor, index = models[sector]
+                    # Seed windows drawn like a live session's (see MarketService._initial_market_state)
+                    if settings.MARKET_SEED_WINDOW == 'latest':
+                        seed_windows = index.latest_window()
+                    else:
+                        seed_windows = index.sample_windows(n, rng)
+                    prices = predictor.generate_forecast_batch(seed_windows, months=months, n=n, rng=rng)
+                    starts = np.asarray(seed_windows)[..., -1, 0] # Each window's last close
+                else:
+                    prices = simulated[..., simulator.column(sector)]
+                    starts = start_prices[simulator.column(sector)]
+                writer.prices[offset:offset + n, :, column] = prices
+                writer.starts[offset:offset + n, column] = starts
+            self.stdout.write(f"  {offset + n}/{count}")
+
+        bank_id = writer.commit(lstm_sectors=sorted(models))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Trajectory bank {bank_id} written to {options['output']} "
+            f"({count / elapsed:.0f} trajectories/s)"
+        ))
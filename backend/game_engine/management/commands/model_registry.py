@@ -0,0 +1,38 @@
+"""
+Loads the stock models through ModelRegistry and reports load time and
+memory per ticker.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from game_engine.ml.registry import ModelRegistry, has_model
+from game_engine.services.config import GameEngineConfig
+
+
+class Command(BaseCommand):
+    help = 'Loads sector stock models and reports load times and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', action='append', dest='tickers',
+                            help='Ticker to load (repeatable, default every sector model)')
+
+    def handle(self, *args, **options):
+        sector_models = GameEngineConfig.CONFIG['SECTOR_MODELS']
+        tickers = options['tickers'] or list(dict.fromkeys(sector_models.values()))
+
+        for sector in GameEngineConfig.CONFIG['STOCK_SECTORS']:
+            ticker = sector_models.get(sector)
+            status = 'model' if ticker and has_model(ticker) else 'GBM fallback'
+            self.stdout.write(f"{sector:<12} {ticker or '-':<10} {status}")
+
+        for ticker in tickers:
+            ModelRegistry.get(ticker)
+
+        stats = ModelRegistry.stats()
+        self.stdout.write(f"\n{'ticker':<10}{'load ms':>10}{'KiB':>10}")
+        for ticker, entry in stats['models'].items():
+            self.stdout.write(f"{ticker:<10}{entry['load_ms']:>10.1f}{entry['bytes'] / 1024:>10.0f}")
+        self.stdout.write(
+            f"Total {stats['bytes'] / 1024:.0f} KiB of {settings.STOCK_MODEL_CACHE_MB} MB cap, "
+            f"{stats['evictions']} evictions"
+        )
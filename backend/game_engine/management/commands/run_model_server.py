@@ -0,0 +1,93 @@
+"""
+Standalone inference process that owns the stock models.
+
+Web workers point settings.STOCK_MODEL_SERVER at this process instead of
+loading torch themselves. Requests from every worker funnel into the same
+ForecastBatcher, so concurrent session starts across the whole deployment
+share batched rollouts.
+"""
+import logging
+import os
+import threading
+from multiprocessing.connection import AuthenticationError, Listener
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_engine.ml.batching import ForecastBatcher
+from game_engine.ml.client import server_address, server_authkey
+from game_engine.ml.inference import configure_torch_threads
+from game_engine.ml.predictor import AIStockPredictor
+from game_engine.ml.registry import has_model
+from game_engine.services.config import GameEngineConfig
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Runs the out-of-process stock model server (see STOCK_MODEL_SERVER)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', action='append', dest='tickers',
+                            help='Model to load and warm up at start (repeatable, default every sector model)')
+
+    def handle(self, *args, **options):
+        address, family = server_address()
+        if not address:
+            raise CommandError("STOCK_MODEL_SERVER is not set.")
+
+        configure_torch_threads()
+        tickers = options['tickers'] or [
+            ticker for ticker in GameEngineConfig.CONFIG['SECTOR_MODELS'].values() if has_model(ticker)
+        ]
+        for ticker in tickers:
+            if not AIStockPredictor.warmup(ticker):
+                self.stdout.write(self.style.WARNING(f"No model for {ticker}; requests will be simulated."))
+
+        if family == 'AF_UNIX' and os.path.exists(address):
+            os.unlink(address) # Stale socket from a previous run
+
+        with Listener(address, family=family, authkey=server_authkey()) as listener:
+            label = address if family == 'AF_UNIX' else '%s:%d' % address
+            self.stdout.write(self.style.SUCCESS(f"Model server listening on {label}"))
+            while True:
+                try:
+                    conn = listener.accept()
+                except AuthenticationError:
+                    logger.warning("Rejected model server client with a bad auth key")
+                    continue
+                except OSError as e:
+                    logger.error("Model server accept failed: %s", e)
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _serve(conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                op = request[0]
+                try:
+                    if op == 'forecast':
+                        _, ticker, seed_data, months = request
+                        trajectory, context = ForecastBatcher.forecast(ticker, seed_data, months)
+                        reply = ('ok', trajectory, context)
+                    elif op == 'implied':
+                        _, ticker, seed_data, months = request
+                        implied = ForecastBatcher.implied_path(ticker, seed_data, months)
+                        reply = ('ok', *implied) if implied else ('error', f"no model for {ticker}")
+                    elif op == 'ping':
+                        reply = ('ok',)
+                    else:
+                        reply = ('error', f"unknown operation {op!r}")
+                except Exception as e:
+                    logger.exception("Model server request failed")
+                    reply = ('error', str(e))
+
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return
@@ -1,88 +1,135 @@
-import pandas as pd
-from django.core.management.base import BaseCommand
-from game_engine.models import MarketTickerData
-from django.conf import settings
+import csv
+import io
 import os
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from game_engine.ml.market_data import FEATURES, load_market_data
+from game_engine.ml.seed_windows import SeedWindowIndex
+from game_engine.models import MarketTickerData
+
 
 class Command(BaseCommand):
     help = 'Seeds source market data from CSV for Cold Start context'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', help='CSV path (default: NIFTY_50_COMPANIES.csv)')
+        parser.add_argument('--ticker', action='append', dest='tickers',
+                            help='Ticker to seed (repeatable; default every ticker in the CSV). '
+                                 'The first one also names CSVs without a Ticker column, which require it.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--replace', action='store_true',
+                            help="Delete each ticker's existing rows first instead of upserting")
+        parser.add_argument('--no-copy', action='store_true', help='Skip the PostgreSQL COPY fast path')
+        parser.add_argument('--refresh', action='store_true', help='Re-parse the CSV even if its .npz cache is fresh')
+
+    def handle(self, *args, **options):
         # Using the uploaded NIFTY_50_COMPANIES.csv
         # Assuming the CSV is in the root directory relative to 'backend' (settings.BASE_DIR)
-        csv_path = os.path.join(settings.BASE_DIR, '..', 'NIFTY_50_COMPANIES.csv')
-        
-        if not os.path.exists(csv_path):
+        candidates = [options['csv']] if options['csv'] else [
+            os.path.join(settings.BASE_DIR, '..', 'NIFTY_50_COMPANIES.csv'),
             # Fallback check mainly for dev environment variation
-            csv_path = os.path.join(settings.BASE_DIR, 'game_engine', 'ml', 'data', 'NIFTY_50_COMPANIES.csv')
-            
-        if not os.path.exists(csv_path):
-            self.stdout.write(self.style.ERROR(f'CSV not found at {csv_path}'))
-            return
+            os.path.join(settings.BASE_DIR, 'game_engine', 'ml', 'data', 'NIFTY_50_COMPANIES.csv'),
+        ]
+        csv_path = next((path for path in candidates if os.path.exists(path)), None)
+        if csv_path is None:
+            # No silent fallback to another file: an index CSV filed under a
+            # company ticker puts every seed window outside the model's scaler range
+            raise CommandError(
+                f"CSV not found at {candidates[0]}. To seed from another file, pass both --csv and --ticker."
+            )
 
-        self.stdout.write("Loading CSV...")
+        requested = options['tickers']
+        self.stdout.write(f"Loading {csv_path}...")
+        # Columnar .npz cache; missing RSI/MACD/Signal/Return are derived from Close
         try:
-            df = pd.read_csv(csv_path)
-            
-            # Filter for RELIANCE.NS as our primary Tech/Bluechip proxy
-            ticker = 'RELIANCE.NS'
-            if 'Ticker' not in df.columns:
-                 # Try to guess column if 'Ticker' is missing or different
-                 if 'Symbol' in df.columns:
-                     ticker_col = 'Symbol'
-                 else:
-                     self.stdout.write(self.style.ERROR(f"CSV missing 'Ticker' column. Columns: {df.columns}"))
-                     return
-            else:
-                 ticker_col = 'Ticker'
-                 
-            data = df[df[ticker_col] == ticker].copy()
-            
-            if data.empty:
-                 self.stdout.write(self.style.WARNING(f"No data found for {ticker} in CSV."))
-                 return
-
-            # Sort and select features required by LSTM
-            # Features: ['Close', 'RSI_14', 'MACD', 'Signal_Line', 'Daily_Return_%']
-            if 'Date' in data.columns:
-                data['Date'] = pd.to_datetime(data['Date'])
-                data = data.sort_values('Date')
-            
-            # Clean Data
-            required_cols = ['Close', 'RSI_14', 'MACD', 'Signal_Line', 'Daily_Return_%']
-            missing_cols = [c for c in required_cols if c not in data.columns]
-            if missing_cols:
-                self.stdout.write(self.style.ERROR(f"Missing columns: {missing_cols}"))
-                return
-                
-            data = data.dropna(subset=required_cols)
-            
-            # Save to DB (Optimized bulk create)
-            records = []
-            self.stdout.write(f"Seeding {len(data)} records for {ticker}...")
-            
-            # Clear old data for this ticker
-            MarketTickerData.objects.filter(ticker=ticker).delete()
-            
-            for index, row in data.iterrows():
-                records.append(MarketTickerData(
-                    ticker=ticker,
-                    date=row['Date'],
-                    close=row['Close'],
-                    rsi=row['RSI_14'],
-                    macd=row['MACD'],
-                    signal=row['Signal_Line'],
-                    daily_return=row['Daily_Return_%']
-                ))
-                
-                if len(records) > 5000:
-                    MarketTickerData.objects.bulk_create(records)
-                    records = []
-                    
-            if records:
-                MarketTickerData.objects.bulk_create(records)
-                
-            self.stdout.write(self.style.SUCCESS(f'Successfully seeded data for {ticker}'))
-            
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error seeding data: {e}"))
+            data = load_market_data(
+                csv_path, default_ticker=requested[0] if requested else None, refresh=options['refresh']
+            )
+        except ValueError as e:
+            raise CommandError(f"{e} (pass --ticker).")
+
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        total_rows = 0
+        started = time.perf_counter()
+
+        for ticker in requested or sorted(data):
+            columns = data.get(ticker)
+            if columns is None:
+                self.stdout.write(self.style.WARNING(f"No data found for {ticker} in CSV."))
+                continue
+
+            # Indicator warm-up rows (e.g. the first 13 RSI values) can't seed the model
+            features = np.column_stack([columns[f] for f in FEATURES])
+            valid = np.isfinite(features).all(axis=1)
+            dates = columns['date'][valid]
+            features = features[valid]
+
+            ticker_started = time.perf_counter()
+            with transaction.atomic():
+                if options['replace']:
+                    MarketTickerData.objects.filter(ticker=ticker).delete()
+                if use_copy:
+                    self._copy_upsert(ticker, dates, features)
+                else:
+                    self._bulk_upsert(ticker, dates, features, options['batch_size'])
+
+            elapsed = time.perf_counter() - ticker_started
+            total_rows += len(dates)
+            self.stdout.write(f"  {ticker}: {len(dates)} rows ({len(dates) / max(elapsed, 1e-9):,.0f} rows/s)")
+            SeedWindowIndex.invalidate(ticker)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Upserted {total_rows} rows via {'COPY' if use_copy else 'bulk insert'} "
+            f"in {elapsed:.2f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)"
+        ))
+
+    @staticmethod
+    def _bulk_upsert(ticker, dates, features, batch_size):
+        """INSERT ... ON CONFLICT (ticker, date) DO UPDATE, in large batches."""
+        MarketTickerData.objects.bulk_create(
+            [
+                MarketTickerData(
+                    ticker=ticker, date=date,
+                    close=close, rsi=rsi, macd=macd, signal=signal, daily_return=daily_return,
+                )
+                for date, (close, rsi, macd, signal, daily_return) in zip(dates.tolist(), features.tolist())
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['ticker', 'date'],
+            update_fields=list(FEATURES),
+        )
+
+    @staticmethod
+    def _copy_upsert(ticker, dates, features):
+        """
+        PostgreSQL fast path: COPY the rows into a temp table, then upsert
+        them into MarketTickerData with a single INSERT ... SELECT.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for date, row in zip(dates.astype(str), features.tolist()):
+            writer.writerow([ticker, date, *row])
+        buffer.seek(0)
+
+        table = MarketTickerData._meta.db_table
+        columns = ', '.join(['ticker', 'date', *FEATURES])
+        updates = ', '.join(f'{f} = EXCLUDED.{f}' for f in FEATURES)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE market_seed_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            cursor.execute("ALTER TABLE market_seed_staging DROP COLUMN id")
+            cursor.cursor.copy_expert(
+                f"COPY market_seed_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM market_seed_staging "
+                f"ON CONFLICT (ticker, date) DO UPDATE SET {updates}"
+            )
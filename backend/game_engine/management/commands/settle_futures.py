@@ -0,0 +1,65 @@
+"""
+Backfills settlement for futures contracts that were never settled
+(sold before settlement ran in advance_month, or whose game ended
+before they matured).
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from game_engine.models import FuturesContract
+from game_engine.services.market_service import MarketService
+
+
+class Command(BaseCommand):
+    help = 'Settles matured futures contracts of past and running sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Sessions per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be settled without saving')
+
+    def handle(self, *args, **options):
+        unsettled = FuturesContract.objects.filter(final_market_price__isnull=True).select_related('session')
+        by_session = defaultdict(list)
+        for contract in unsettled.iterator():
+            by_session[contract.session_id].append(contract)
+
+        session_ids = sorted(by_session)
+        totals = {'contracts': 0, 'successful': 0, 'hedge_pnl': 0}
+        for start in range(0, len(session_ids), options['batch_size']):
+            settled = []
+            for session_id in session_ids[start:start + options['batch_size']]:
+                settled.extend(self._settle_session(by_session[session_id], totals))
+            if settled and not options['dry_run']:
+                with transaction.atomic():
+                    FuturesContract.objects.bulk_update(settled, ['final_market_price', 'is_successful'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would settle' if options['dry_run'] else 'Settled'} {totals['contracts']} contracts "
+            f"across {len(session_ids)} sessions: {totals['successful']} beat the market, "
+            f"hedge P&L ₹{totals['hedge_pnl']:+,}"
+        ))
+
+    @staticmethod
+    def _settle_session(contracts, totals):
+        """Settle one session's contracts: at the maturity month's price, or the final price if the game ended first."""
+        session = contracts[0].session
+        by_month = defaultdict(list)
+        for contract in contracts:
+            if contract.maturity_month <= session.current_month:
+                by_month[contract.maturity_month].append(contract)
+            elif not session.is_active:
+                by_month[None].append(contract)
+            # Still running and not yet mature: advance_month settles it
+
+        settled = []
+        for month, due in by_month.items():
+            prices = dict(session.market_prices)
+            if month is not None:
+                prices.update(MarketService._sector_prices_at(session, month))
+            summary = MarketService._settle_contracts(due, prices)
+            for key in totals:
+                totals[key] += summary[key]
+            settled.extend(due)
+        return settled
@@ -0,0 +1,185 @@
+"""
+Trains colab_architecture.StockPredictor on CPU from MarketTickerData or
+the market CSV cache, and writes a versioned model/scaler pair that
+AIStockPredictor can load.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import torch
+import torch.nn as nn
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sklearn.preprocessing import MinMaxScaler
+from torch.utils.data import DataLoader
+
+from game_engine.ml.colab_architecture import StockPredictor
+from game_engine.ml.market_data import FEATURES, load_market_data
+from game_engine.ml.registry import model_paths
+from game_engine.ml.training import LengthGroupedSampler, WindowDataset, worker_init
+from game_engine.models import MarketTickerData
+
+
+class Command(BaseCommand):
+    help = 'Trains the stock LSTM on CPU and writes a versioned model/scaler pair'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', default='RELIANCE.NS', help='MarketTickerData / CSV ticker to train on')
+        parser.add_argument('--source', choices=['db', 'csv'], default='db')
+        parser.add_argument('--csv', help='Market CSV to train on with --source csv (required)')
+        parser.add_argument('--windows', default='60,90,120', help='Comma-separated training window lengths')
+        parser.add_argument('--epochs', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=128)
+        parser.add_argument('--lr', type=float, default=1e-3)
+        parser.add_argument('--val-fraction', type=float, default=0.15, help='Most recent share of rows held out')
+        parser.add_argument('--patience', type=int, default=5, help='Epochs without validation improvement before stopping')
+        parser.add_argument('--workers', type=int, default=2, help='DataLoader worker processes')
+        parser.add_argument('--threads', type=int, default=os.cpu_count(), help='torch intra-op threads')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--checkpoint-dir', default=None, help='Default: ml/models/checkpoints/<ticker>')
+        parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+        parser.add_argument('--activate', action='store_true',
+                            help='Also install the result as the live model the predictor loads')
+
+    def handle(self, *args, **options):
+        ticker = options['ticker']
+        if options['source'] == 'csv' and not options['csv']:
+            # No default file: training one ticker on another's prices (and
+            # --activate-ing the result) silently breaks the live model
+            raise CommandError("--source csv needs an explicit --csv (and the --ticker its rows belong to).")
+        if options['epochs'] < 1:
+            raise CommandError("--epochs must be at least 1.")
+        name = ticker.split('.')[0].lower() # RELIANCE.NS -> reliance, as in ml/models/
+        models_dir = os.path.join(settings.BASE_DIR, 'game_engine', 'ml', 'models')
+        checkpoint_dir = options['checkpoint_dir'] or os.path.join(models_dir, 'checkpoints', name)
+        checkpoint_path = os.path.join(checkpoint_dir, 'last.pt')
+        windows = sorted(int(w) for w in options['windows'].split(','))
+
+        torch.manual_seed(options['seed'])
+        torch.set_num_threads(options['threads'])
+
+        # 1. Data, chronological split, scaler fit on the training rows only
+        rows = self._load_rows(ticker, options)
+        split = int(len(rows) * (1 - options['val_fraction']))
+        if split <= windows[-1] or len(rows) - split < 10:
+            raise CommandError(f"{len(rows)} rows of {ticker} is too little for windows up to {windows[-1]}.")
+
+        resume = torch.load(checkpoint_path, weights_only=False) if options['resume'] and os.path.exists(checkpoint_path) else None
+        scaler = resume['scaler'] if resume else MinMaxScaler(feature_range=(-1, 1)).fit(rows[:split])
+        scaled = scaler.transform(rows)
+
+        train_set = WindowDataset(scaled, range(windows[0], split), windows)
+        # Validation targets are all after the split; their windows may reach back into training rows
+        val_set = WindowDataset(scaled, range(split, len(rows)), [60])
+        loader_kwargs = dict(
+            num_workers=options['workers'], worker_init_fn=worker_init,
+            persistent_workers=options['workers'] > 0,
+        )
+        train_sampler = LengthGroupedSampler(train_set.lengths(), options['batch_size'], seed=options['seed'])
+        train_loader = DataLoader(train_set, batch_sampler=train_sampler, **loader_kwargs)
+        val_loader = DataLoader(val_set, batch_size=512, **loader_kwargs)
+
+        # 2. Model / optimizer, optionally resumed
+        model = StockPredictor(input_dim=5, hidden_dim=64, num_layers=2, output_dim=1)
+        optimizer = torch.optim.Adam(model.parameters(), lr=options['lr'])
+        loss_fn = nn.MSELoss()
+        start_epoch, best_val, bad_epochs, best_state = 0, float('inf'), 0, None
+        if resume:
+            model.load_state_dict(resume['model'])
+            optimizer.load_state_dict(resume['optimizer'])
+            start_epoch, best_val = resume['epoch'] + 1, resume['best_val']
+            bad_epochs, best_state = resume['bad_epochs'], resume['best_state']
+            self.stdout.write(f"Resumed from epoch {resume['epoch'] + 1} (best val {best_val:.6f})")
+
+        self.stdout.write(
+            f"Training on {len(train_set)} windows ({', '.join(map(str, windows))}), "
+            f"validating on {len(val_set)}; {options['threads']} threads, {options['workers']} loader workers"
+        )
+
+        # 3. Epochs with early stopping and a checkpoint after each
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        for epoch in range(start_epoch, options['epochs']):
+            started = time.perf_counter()
+            train_sampler.set_epoch(epoch)
+            model.train()
+            train_loss = 0.0
+            for x, y in train_loader:
+                optimizer.zero_grad()
+                loss = loss_fn(model(x), y)
+                loss.backward()
+                nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+                optimizer.step()
+                train_loss += loss.item() * len(x)
+            train_loss /= len(train_set)
+            val_loss = self._evaluate(model, val_loader, loss_fn)
+
+            if val_loss < best_val:
+                best_val, bad_epochs = val_loss, 0
+                best_state = {k: v.clone() for k, v in model.state_dict().items()}
+            else:
+                bad_epochs += 1
+
+            torch.save({
+                'model': model.state_dict(), 'optimizer': optimizer.state_dict(), 'epoch': epoch,
+                'best_val': best_val, 'bad_epochs': bad_epochs, 'best_state': best_state, 'scaler': scaler,
+            }, checkpoint_path)
+            self.stdout.write(
+                f"epoch {epoch + 1:>3}  train {train_loss:.6f}  val {val_loss:.6f}  "
+                f"({time.perf_counter() - started:.1f}s){'  *' if bad_epochs == 0 else ''}"
+            )
+            if bad_epochs >= options['patience']:
+                self.stdout.write(f"Early stopping: no improvement for {bad_epochs} epochs.")
+                break
+
+        if best_state is None:
+            # Resumed past --epochs, or validation loss never became finite
+            raise CommandError("No epoch improved on the validation set; no model written.")
+
+        # 4. Versioned model/scaler pair (+ metadata); optionally make it live
+        version = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+        versions_dir = os.path.join(models_dir, 'versions')
+        os.makedirs(versions_dir, exist_ok=True)
+        base = os.path.join(versions_dir, f'{name}_{version}')
+        torch.save(best_state, f'{base}_model.pth')
+        joblib.dump(scaler, f'{base}_scaler.pkl')
+        with open(f'{base}.json', 'w') as f:
+            json.dump({
+                'ticker': ticker, 'version': version, 'source': options['source'], 'rows': len(rows),
+                'windows': windows, 'val_loss': best_val,
+            }, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Model {version} written to {base}_model.pth (val {best_val:.6f})"))
+
+        if options['activate']:
+            model_path, scaler_path = model_paths(name)
+            shutil.copyfile(f'{base}_model.pth', model_path)
+            shutil.copyfile(f'{base}_scaler.pkl', scaler_path)
+            self.stdout.write(self.style.SUCCESS(f"Activated as {model_path}"))
+
+    @staticmethod
+    def _load_rows(ticker, options):
+        if options['source'] == 'csv':
+            columns = load_market_data(options['csv'], default_ticker=ticker).get(ticker)
+            if columns is None:
+                raise CommandError(f"No {ticker} rows in {options['csv']}.")
+            rows = np.column_stack([columns[f] for f in FEATURES])
+        else:
+            rows = np.array(
+                MarketTickerData.objects.filter(ticker=ticker).order_by('date').values_list(*FEATURES),
+                dtype=np.float64,
+            ).reshape(-1, len(FEATURES))
+        return rows[np.isfinite(rows).all(axis=1)]
+
+    @staticmethod
+    def _evaluate(model, loader, loss_fn):
+        model.eval()
+        total, count = 0.0, 0
+        with torch.no_grad():
+            for x, y in loader:
+                total += loss_fn(model(x), y).item() * len(x)
+                count += len(x)
+        return total / count
@@ -0,0 +1,106 @@
+"""
+Accuracy guardrail for the int8 inference mode (settings.STOCK_MODEL_QUANTIZE).
+
+Replays the latest 60-row seed window from MarketTickerData through the
+float32 and dynamically quantized models with identical chaos-factor RNG
+streams, and fails if the quantized forecasts drift past tolerance.
+"""
+import io
+import random
+import time
+
+import numpy as np
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from game_engine.ml.predictor import AIStockPredictor
+from game_engine.models import MarketTickerData
+
+
+class Command(BaseCommand):
+    help = 'Checks int8-quantized StockPredictor forecasts against float32 on the seed window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ticker', default='RELIANCE')
+        parser.add_argument('--months', type=int, default=12, help='Forecast length per replay')
+        parser.add_argument('--runs', type=int, default=5, help='Replays with different chaos seeds')
+        parser.add_argument('--step-tolerance', type=float, default=0.005,
+                            help='Max relative error of the one-step close prediction')
+        parser.add_argument('--tolerance', type=float, default=0.02,
+                            help='Max relative drift of any month-end forecast price')
+
+    def handle(self, *args, **options):
+        ticker = options['ticker'].upper()
+        months = options['months']
+
+        seed_rows = list(
+            MarketTickerData.objects.filter(ticker=f'{ticker}.NS').order_by('-date').values_list(
+                'close', 'rsi', 'macd', 'signal', 'daily_return'
+            )[:60]
+        )
+        if len(seed_rows) < 60:
+            raise CommandError(f"Need 60 rows of {ticker}.NS in MarketTickerData, found {len(seed_rows)}.")
+        seed_window = np.array(seed_rows[::-1], dtype=np.float64)
+
+        base = AIStockPredictor(ticker)
+        if base.scaler is None:
+            raise CommandError(f"No model/scaler files for {ticker}.")
+
+        # Same compile setting for both so only quantization differs
+        variants = {}
+        for label, quantize in (('float32', False), ('int8', True)):
+            predictor = AIStockPredictor(ticker)
+            predictor.model = AIStockPredictor.load_model(base.model_path, quantize=quantize)
+            variants[label] = predictor
+        float_model, int8_model = variants['float32'], variants['int8']
+
+        # 1. One-step prediction off the seed window
+        scaled = float_model._scale(seed_window)
+        float_step = float_model._inverse_close(float_model._predict(scaled)[0])
+        int8_step = int8_model._inverse_close(int8_model._predict(scaled)[0])
+        step_error = abs(int8_step - float_step) / abs(float_step)
+        self.stdout.write(f"One-step close: float32 {float_step:.2f}, int8 {int8_step:.2f} ({step_error:.3%})")
+
+        # 2. Full forecasts with identical chaos sequences
+        drifts = []
+        timings = {'float32': [], 'int8': []}
+        for run in range(options['runs']):
+            paths = {}
+            for label, predictor in variants.items():
+                started = time.perf_counter()
+                paths[label] = np.array(
+                    predictor.generate_forecast(seed_window, months=months, rng=random.Random(run)),
+                    dtype=np.float64,
+                )
+                timings[label].append(time.perf_counter() - started)
+            drift = np.abs(paths['int8'] - paths['float32']) / np.maximum(paths['float32'], 1)
+            drifts.append(drift)
+            self.stdout.write(f"  run {run}: max drift {drift.max():.3%}, month-{months} drift {drift[-1]:.3%}")
+
+        drifts = np.array(drifts)
+        self.stdout.write(
+            f"Forecast drift over {options['runs']} x {months} months: "
+            f"mean {drifts.mean():.3%}, max {drifts.max():.3%}"
+        )
+        for label in variants:
+            self.stdout.write(
+                f"{label:<8} forecast {np.median(timings[label]) * 1000:.1f} ms, "
+                f"weights {self._weights_size(base.model_path, quantize=label == 'int8') / 1024:.0f} KiB"
+            )
+
+        failures = []
+        if step_error > options['step_tolerance']:
+            failures.append(f"one-step error {step_error:.3%} > {options['step_tolerance']:.3%}")
+        if drifts.max() > options['tolerance']:
+            failures.append(f"forecast drift {drifts.max():.3%} > {options['tolerance']:.3%}")
+        if failures:
+            raise CommandError("Quantized model outside tolerance: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Quantized model within tolerance."))
+
+    @staticmethod
+    def _weights_size(model_path, quantize):
+        """Serialized state-dict size, a proxy for per-worker model memory."""
+        model = AIStockPredictor.load_model(model_path, quantize=quantize, compile=False)
+        buffer = io.BytesIO()
+        torch.save(model.state_dict(), buffer)
+        return buffer.tell()
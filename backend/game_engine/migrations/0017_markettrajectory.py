@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_trajectories(apps, schema_editor):
+    """
+    Give existing sessions a generation cursor so their history can be
+    extended past the 12 months generated at start. Their original
+    generator state is gone, so every sector continues as GBM from its
+    last stored price.
+    """
+    StockHistory = apps.get_model('game_engine', 'StockHistory')
+    MarketTrajectory = apps.get_model('game_engine', 'MarketTrajectory')
+
+    cursors = {}
+    rows = StockHistory.objects.order_by('session_id', 'month').values_list(
+        'session_id', 'sector', 'month', 'price'
+    )
+    for session_id, sector, month, price in rows.iterator():
+        cursor = cursors.setdefault(session_id, {'horizon': 0, 'state': {}})
+        cursor['horizon'] = max(cursor['horizon'], month)
+        cursor['state'][sector] = {'engine': 'gbm', 'price': price}
+
+    MarketTrajectory.objects.bulk_create(
+        [
+            MarketTrajectory(session_id=session_id, horizon=c['horizon'], state=c['state'])
+            for session_id, c in cursors.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0016_markettickerdata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketTrajectory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.IntegerField(default=0)),
+                ('state', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='market_trajectory', to='game_engine.gamesession')),
+            ],
+        ),
+        migrations.RunPython(backfill_trajectories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0017_markettrajectory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markettrajectory',
+            name='fund_returns',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='markettrajectory',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
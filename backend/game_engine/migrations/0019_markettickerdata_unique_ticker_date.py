@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:43
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def drop_duplicate_days(apps, schema_editor):
+    """Keep the newest row per (ticker, date) so the unique constraint can be added."""
+    MarketTickerData = apps.get_model('game_engine', 'MarketTickerData')
+    duplicates = (
+        MarketTickerData.objects.values('ticker', 'date')
+        .annotate(keep=Max('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        MarketTickerData.objects.filter(ticker=dup['ticker'], date=dup['date']).exclude(id=dup['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0018_markettrajectory_seed_fund_returns'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_days, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='markettickerdata',
+            name='game_engine_ticker_1ad959_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='markettickerdata',
+            constraint=models.UniqueConstraint(fields=('ticker', 'date'), name='unique_ticker_date'),
+        ),
+    ]
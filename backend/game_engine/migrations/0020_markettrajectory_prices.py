@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:48
+
+from django.db import migrations, models
+
+
+def pack_stock_history(apps, schema_editor):
+    """Move each trajectory's StockHistory rows into MarketTrajectory.prices."""
+    MarketTrajectory = apps.get_model('game_engine', 'MarketTrajectory')
+    StockHistory = apps.get_model('game_engine', 'StockHistory')
+    for trajectory in MarketTrajectory.objects.iterator():
+        rows = StockHistory.objects.filter(session_id=trajectory.session_id).order_by('month')
+        prices = {}
+        for sector, month, price in rows.values_list('sector', 'month', 'price'):
+            series = prices.setdefault(sector, [])
+            # Index 0 = month 1; a missing month repeats the previous price
+            series.extend([series[-1] if series else price] * (month - 1 - len(series)))
+            series.append(price)
+        trajectory.prices = prices
+        trajectory.save(update_fields=['prices'])
+        rows.delete()
+
+
+def unpack_stock_history(apps, schema_editor):
+    MarketTrajectory = apps.get_model('game_engine', 'MarketTrajectory')
+    StockHistory = apps.get_model('game_engine', 'StockHistory')
+    for trajectory in MarketTrajectory.objects.iterator():
+        StockHistory.objects.bulk_create([
+            StockHistory(session_id=trajectory.session_id, sector=sector, month=i + 1, price=price)
+            for sector, series in trajectory.prices.items()
+            for i, price in enumerate(series)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0019_markettickerdata_unique_ticker_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='markettrajectory',
+            name='prices',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(pack_stock_history, unpack_stock_history),
+    ]
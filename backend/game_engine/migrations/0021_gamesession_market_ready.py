@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0020_markettrajectory_prices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='market_ready',
+            field=models.BooleanField(default=True),
+        ),
+    ]
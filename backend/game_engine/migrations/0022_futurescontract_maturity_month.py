@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_maturity_month(apps, schema_editor):
+    FuturesContract = apps.get_model('game_engine', 'FuturesContract')
+    FuturesContract.objects.update(maturity_month=F('created_month') + F('duration_months'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0021_gamesession_market_ready'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='futurescontract',
+            name='maturity_month',
+            field=models.IntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_maturity_month, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='futurescontract',
+            index=models.Index(fields=['session', 'maturity_month'], name='game_engine_session_b183e9_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:56
+
+from django.db import migrations, models
+
+
+def value_portfolios(apps, schema_editor):
+    """Stocks + mutual funds at current prices, plus pending IPO applications at cost."""
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    sessions = []
+    for session in GameSession.objects.only('portfolio', 'mutual_funds', 'active_ipos', 'market_prices').iterator():
+        prices = session.market_prices or {}
+        value = sum(units * prices.get(sector, 100) for sector, units in (session.portfolio or {}).items())
+        value += sum(
+            data.get('units', 0) * prices.get(f"MF_{fund}", 100) for fund, data in (session.mutual_funds or {}).items()
+        )
+        value += sum(ipo['amount'] for ipo in (session.active_ipos or []) if ipo.get('status') == 'APPLIED')
+        session.portfolio_value = max(0.0, float(value))
+        sessions.append(session)
+    GameSession.objects.bulk_update(sessions, ['portfolio_value'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0022_futurescontract_maturity_month'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='portfolio_value',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(value_portfolios, migrations.RunPython.noop),
+    ]
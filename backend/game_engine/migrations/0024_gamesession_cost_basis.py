@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:57
+
+from django.db import migrations, models
+
+
+def build_cost_basis(apps, schema_editor):
+    """
+    Replay purchase_history into average-cost positions. Sales were never
+    recorded, so each position is scaled down to the units still held;
+    units without a recorded purchase are costed at the current price.
+    """
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    sessions = []
+    for session in GameSession.objects.only('portfolio', 'market_prices', 'purchase_history').iterator():
+        bought = {}
+        for purchase in session.purchase_history or []:
+            position = bought.setdefault(purchase['sector'], [0.0, 0.0])
+            position[0] += purchase['units']
+            position[1] += purchase['units'] * purchase['price']
+
+        cost_basis = {}
+        for sector, held in (session.portfolio or {}).items():
+            units, cost = bought.get(sector, (0.0, 0.0))
+            if held <= 0 and not units:
+                continue
+            if held <= units:
+                cost = cost * held / units if units else 0.0
+            else:
+                cost += (held - units) * (session.market_prices or {}).get(sector, 100)
+            cost_basis[sector] = {'units': max(0.0, held), 'cost': cost, 'realized': 0.0}
+        session.cost_basis = cost_basis
+        sessions.append(session)
+    GameSession.objects.bulk_update(sessions, ['cost_basis'], batch_size=500)
+
+
+def restore_purchase_history(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    sessions = []
+    for session in GameSession.objects.only('cost_basis').iterator():
+        session.purchase_history = [
+            {'sector': sector, 'units': p['units'], 'price': p['cost'] / p['units'], 'month': 0}
+            for sector, p in session.cost_basis.items() if p['units'] > 0
+        ]
+        sessions.append(session)
+    GameSession.objects.bulk_update(sessions, ['purchase_history'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0023_gamesession_portfolio_value'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='cost_basis',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(build_cost_basis, restore_purchase_history),
+        migrations.RemoveField(
+            model_name='gamesession',
+            name='purchase_history',
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+# GameEngineConfig.CONFIG['MONTHLY_SALARY'] when this migration was written
+MONTHLY_SALARY = 25000
+
+
+def fill_counters(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    RecurringExpense = apps.get_model('game_engine', 'RecurringExpense')
+    IncomeSource = apps.get_model('game_engine', 'IncomeSource')
+
+    bills = {
+        row['session_id']: row
+        for row in RecurringExpense.objects.filter(is_cancelled=False).values('session_id').annotate(
+            total=Sum('amount'),
+            essential=Sum('amount', filter=Q(is_essential=True)),
+            debt=Sum('amount', filter=Q(category='DEBT')),
+        )
+    }
+    income = {
+        row['session_id']: row
+        for row in IncomeSource.objects.values('session_id').annotate(
+            sources=Count('id'),
+            expected=Sum('amount_base'),
+            freelance=Sum('amount_base', filter=Q(source_type='FREELANCE')),
+        )
+    }
+
+    sessions = []
+    for session in GameSession.objects.only('id').iterator():
+        b = bills.get(session.id, {})
+        i = income.get(session.id)
+        session.recurring_expenses = b.get('total') or 0
+        session.essential_expenses = b.get('essential') or 0
+        session.debt_emi = b.get('debt') or 0
+        session.expected_income = (i['expected'] or 0) if i else MONTHLY_SALARY
+        session.freelance_income = (i['freelance'] or 0) if i else 0
+        session.income_source_count = i['sources'] if i else 0
+        sessions.append(session)
+    GameSession.objects.bulk_update(
+        sessions,
+        [
+            'recurring_expenses', 'essential_expenses', 'debt_emi',
+            'expected_income', 'freelance_income', 'income_source_count',
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0024_gamesession_cost_basis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='debt_emi',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='essential_expenses',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='expected_income',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='freelance_income',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='income_source_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:29
+
+import game_engine.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0025_gamesession_cash_flow_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamesession',
+            name='expected_income',
+            field=models.IntegerField(default=game_engine.models.default_expected_income),
+        ),
+    ]
@@ -0,0 +1,153 @@
+"""
+Cross-request micro-batching for LSTM forecasts.
+
+When several sessions start (or extend their market history) at once,
+each would otherwise run its own sequential rollout on the shared model,
+with every request thread competing for the same CPU cores. Instead,
+callers enqueue their seed window and block on a Future. A dispatcher
+thread per ticker collects requests for a few milliseconds, runs them as
+one batched rollout, and hands each caller back its own trajectory.
+Noise-free implied paths (ml.client.implied_path) are queued the same
+way, so every rollout in the process counts against the same
+STOCK_INFERENCE_CONCURRENCY cap.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+from django.conf import settings
+
+from .predictor import AIStockPredictor
+
+logger = logging.getLogger(__name__)
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def _inference_slots():
+    """Process-wide cap on rollouts running at once (across tickers)."""
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.STOCK_INFERENCE_CONCURRENCY)
+    return _slots
+
+
+class ForecastBatcher:
+    """Queues forecast requests for one ticker and runs them in batches."""
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, ticker, window_ms, max_batch):
+        self.ticker = ticker.upper()
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f'forecast-batcher-{self.ticker}', daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def for_ticker(cls, ticker):
+        ticker = ticker.upper()
+        batcher = cls._instances.get(ticker)
+        if batcher is None:
+            with cls._lock:
+                batcher = cls._instances.get(ticker)
+                if batcher is None:
+                    batcher = cls(
+                        ticker,
+                        window_ms=settings.STOCK_FORECAST_BATCH_WINDOW_MS,
+                        max_batch=settings.STOCK_FORECAST_MAX_BATCH,
+                    )
+                    cls._instances[ticker] = batcher
+        return batcher
+
+    @classmethod
+    def forecast(cls, ticker, seed_data, months, rng=None):
+        """
+        Same result as AIStockPredictor(ticker).generate_forecast(seed_data,
+        months, rng=rng, return_context=True), batched with concurrent
+        callers. Runs inline when batching is disabled
+        (STOCK_FORECAST_BATCH_WINDOW_MS = 0).
+        """
+        if settings.STOCK_FORECAST_BATCH_WINDOW_MS <= 0:
+            with _inference_slots():
+                return AIStockPredictor(ticker).generate_forecast(
+                    seed_data, months=months, rng=rng, return_context=True
+                )
+        return cls.for_ticker(ticker).submit(seed_data, months, rng).result()
+
+    @classmethod
+    def implied_path(cls, ticker, seed_data, months):
+        """
+        Same result as AIStockPredictor(ticker).implied_path(seed_data,
+        months), batched with concurrent callers.
+        """
+        if settings.STOCK_FORECAST_BATCH_WINDOW_MS <= 0:
+            with _inference_slots():
+                return AIStockPredictor(ticker).implied_path(seed_data, months)
+        return cls.for_ticker(ticker).submit(seed_data, months, implied=True).result()
+
+    def submit(self, seed_data, months, rng=None, implied=False):
+        """
+        Enqueue a request; the Future resolves to (trajectory, context),
+        or to implied_path's result with `implied`.
+        """
+        future = Future()
+        window = np.asarray(seed_data, dtype=np.float64)[-60:]
+        self._queue.put((window, months, rng, future, implied))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with _inference_slots():
+                self._execute(batch)
+
+    def _execute(self, batch):
+        # Requests for different chunk lengths (or implied paths) roll out separately
+        groups = defaultdict(list)
+        for request in batch:
+            if request[3].set_running_or_notify_cancel():
+                groups[request[1], request[4]].append(request)
+
+        predictor = AIStockPredictor(self.ticker)
+        for (months, implied), requests in groups.items():
+            windows = [window for window, _, _, _, _ in requests]
+            try:
+                if implied:
+                    paths = predictor.implied_paths(windows, months=months)
+                    results = paths if paths is not None else [None] * len(requests)
+                else:
+                    trajectories, contexts = predictor.generate_forecast_many(
+                        windows,
+                        months=months,
+                        rngs=[rng for _, _, rng, _, _ in requests],
+                    )
+                    results = list(zip(trajectories, contexts))
+            except Exception as e:
+                logger.exception("[%s] Batched forecast of %d failed", self.ticker, len(requests))
+                for request in requests:
+                    request[3].set_exception(e)
+                continue
+
+            for request, result in zip(requests, results):
+                request[3].set_result(result)
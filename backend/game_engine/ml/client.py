@@ -0,0 +1,162 @@
+"""
+Forecast entry point for web workers.
+
+With settings.STOCK_MODEL_SERVER set, forecasts are requested from the
+standalone model server (`manage.py run_model_server`) over a local
+socket, so web workers never import torch or hold a model copy. If the
+server can't be reached, the NumPy simulator stands in. Without it,
+forecasts run in-process through ForecastBatcher (torch is imported on
+first use).
+
+cached_forecast() additionally shares the noise-free model rollout for a
+seed window across sessions through the Django cache.
+
+NumPy only at import time.
+"""
+import hashlib
+import logging
+import os
+from multiprocessing.connection import AuthenticationError, Client
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .registry import model_paths
+from .simulator import fallback_path
+
+logger = logging.getLogger(__name__)
+
+
+class ModelServerError(Exception):
+    """The model server answered, but the forecast failed."""
+
+
+def server_address():
+    """(address, family) for multiprocessing.connection, from settings."""
+    address = settings.STOCK_MODEL_SERVER
+    if ':' in address and not address.startswith('/'):
+        host, port = address.rsplit(':', 1)
+        return (host, int(port)), 'AF_INET'
+    return address, 'AF_UNIX'
+
+
+def server_authkey():
+    return settings.STOCK_MODEL_SERVER_AUTHKEY.encode()
+
+
+def forecast(ticker, seed_data, months):
+    """
+    Forecast `months` month-end prices for `ticker` from a 60-row seed
+    window. Returns (trajectory, final 60-row context), like
+    AIStockPredictor.generate_forecast(..., return_context=True).
+    """
+    if not settings.STOCK_MODEL_SERVER:
+        from .batching import ForecastBatcher
+        return ForecastBatcher.forecast(ticker, seed_data, months)
+
+    try:
+        return _remote_forecast(ticker, seed_data, months)
+    except AuthenticationError:
+        logger.error("Model server rejected the auth key; check STOCK_MODEL_SERVER_AUTHKEY. Using simulation.")
+    except (OSError, EOFError, TimeoutError, ModelServerError) as e:
+        logger.warning("Model server unavailable (%s). Using simulation.", e)
+    return simulated_forecast(seed_data, months)
+
+
+def _remote_forecast(ticker, seed_data, months):
+    return _request('forecast', ticker, np.asarray(seed_data, dtype=np.float64)[-60:], months)
+
+
+def _request(op, *args):
+    address, family = server_address()
+    with Client(address, family=family, authkey=server_authkey()) as conn:
+        conn.send((op, *args))
+        if not conn.poll(settings.STOCK_MODEL_SERVER_TIMEOUT):
+            raise TimeoutError(f"no reply within {settings.STOCK_MODEL_SERVER_TIMEOUT}s")
+        status, *payload = conn.recv()
+    if status != 'ok':
+        raise ModelServerError(payload[0] if payload else status)
+    return tuple(payload)
+
+
+def cached_forecast(ticker, model_context, price, months, rng=None):
+    """
+    Forecast from the cached noise-free model path plus per-session chaos.
+
+    Every session seeded from the same window shares one model rollout
+    (see implied_path); only the chaos factor is drawn per session, so a
+    cache hit runs no inference at all. `model_context` is the noise-free
+    60-row window and `price` the session's actual last price.
+    rng: numpy Generator or seed for the chaos draws.
+    Returns (int trajectory, next model_context, next price).
+    """
+    implied = implied_path(ticker, model_context, months)
+    if implied is None:
+        # No model reachable: plain simulation, retry the model next chunk
+        trajectory = fallback_path(price, months, rng=rng)
+        return trajectory, np.asarray(model_context, dtype=np.float64), float(trajectory[-1])
+
+    path, next_context = implied
+    start = np.asarray(model_context, dtype=np.float64)[-1, 0]
+    monthly_growth = np.asarray(path) / np.concatenate([[start], path[:-1]])
+
+    # Same chaos factor as AIStockPredictor.generate_forecast, 20 trading days a month
+    rng = np.random.default_rng(rng)
+    shock = rng.random((months, 20)) < 0.05
+    chaos = np.where(shock, rng.uniform(-0.05, 0.05, (months, 20)), rng.normal(0, 0.01, (months, 20)))
+
+    prices = price * np.cumprod(monthly_growth * np.prod(1 + chaos, axis=1))
+    return [int(p) for p in prices], next_context, float(prices[-1])
+
+
+def implied_path(ticker, model_context, months):
+    """
+    AIStockPredictor.implied_path, cached in the Django cache under
+    (ticker, model version, months, seed window hash). None if no model
+    is available.
+    """
+    window = np.ascontiguousarray(np.asarray(model_context, dtype=np.float64)[-60:])
+    key = 'forecast-path:{}:{}:{}:{}'.format(
+        ticker, model_version(ticker), months, hashlib.sha1(window.tobytes()).hexdigest()
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        if settings.STOCK_MODEL_SERVER:
+            implied = _request('implied', ticker, window, months)
+        else:
+            from .batching import ForecastBatcher
+            implied = ForecastBatcher.implied_path(ticker, window, months)
+    except AuthenticationError:
+        logger.error("Model server rejected the auth key; check STOCK_MODEL_SERVER_AUTHKEY. Using simulation.")
+        return None
+    except (OSError, EOFError, TimeoutError, ModelServerError) as e:
+        logger.warning("Model server unavailable (%s). Using simulation.", e)
+        return None
+
+    if implied is not None:
+        implied = (list(implied[0]), np.asarray(implied[1]))
+        cache.set(key, implied, settings.STOCK_FORECAST_CACHE_TIMEOUT)
+    return implied
+
+
+def model_version(ticker):
+    """Identifies the weights (and quantization mode) a cached path came from."""
+    model_path, _ = model_paths(ticker)
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return 'none'
+    mode = 'int8' if settings.STOCK_MODEL_QUANTIZE else 'fp32'
+    return f"{stat.st_mtime_ns}-{stat.st_size}-{mode}"
+
+
+def simulated_forecast(seed_data, months):
+    """GBM stand-in for the LSTM, continuing from the window's last close."""
+    context = np.array(seed_data, dtype=np.float64)[-60:]
+    trajectory = fallback_path(context[-1, 0], months)
+    context[-1, 0] = trajectory[-1]
+    return trajectory, context
@@ -29,3 +29,14 @@ class StockPredictor(nn.Module):
         # Decode the hidden state of the last time step
         out = self.fc(out[:, -1, :])
         return out
+
+    def step(self, x, state=None):
+        """
+        Stateful variant of forward() for incremental inference.
+        Runs `x` through the LSTM starting from `state` (zeros when None)
+        and returns (prediction, (h, c)) so the caller can feed the next
+        timestep without replaying the whole window.
+        """
+        out, state = self.lstm(x, state)
+        out = self.fc(out[:, -1, :])
+        return out, state
@@ -0,0 +1,96 @@
+"""
+Streaming technical indicators for simulated price paths.
+
+Keeps RSI-14, MACD(12, 26) and its 9-day signal line current as each
+simulated close arrives, in O(1) per step and vectorized over a batch of
+trajectories, so the forecast loop can feed the model fresh features
+instead of repeating the seed window's last values.
+
+Definitions match the training data (NIFTY_50.csv / MarketTickerData):
+EMAs are pandas ewm(span, adjust=False) and RSI_14 uses simple 14-day
+averages of gains and losses.
+
+NumPy only.
+"""
+import numpy as np
+
+
+class StreamingIndicators:
+    RSI_PERIOD = 14
+    FAST, SLOW, SIGNAL = 12, 26, 9
+
+    def __init__(self, last_close, ema_fast, ema_slow, signal, gains, losses):
+        self.last_close = last_close
+        self.ema_fast = ema_fast
+        self.ema_slow = ema_slow
+        self.signal = signal
+        # (n, 14) ring buffers of the latest daily gains/losses
+        self.gains = gains
+        self.losses = losses
+        self._pos = 0
+
+    @staticmethod
+    def _alpha(span):
+        return 2 / (span + 1)
+
+    @classmethod
+    def from_window(cls, windows):
+        """
+        Picks up where a seed window leaves off.
+        windows: (n, rows, 5) or (rows, 5) [Close, RSI, MACD, Signal, Return],
+        at least 15 rows.
+
+        RSI needs only the last 14 close-to-close moves, so it continues
+        exactly. The fast EMA is rebuilt from the window's closes. Its
+        starting error decays to ~1e-4 over 60 rows. The slow EMA and the
+        signal line are then anchored so MACD and Signal continue from
+        the stored values.
+        """
+        windows = np.asarray(windows, dtype=np.float64)
+        if windows.ndim == 2:
+            windows = windows[None]
+        closes = windows[:, :, 0]
+
+        alpha = cls._alpha(cls.FAST)
+        ema_fast = closes[:, 0].copy()
+        for t in range(1, closes.shape[1]):
+            ema_fast += alpha * (closes[:, t] - ema_fast)
+
+        moves = np.diff(closes[:, -(cls.RSI_PERIOD + 1):], axis=1)
+        return cls(
+            last_close=closes[:, -1].copy(),
+            ema_fast=ema_fast,
+            ema_slow=ema_fast - windows[:, -1, 2],
+            signal=windows[:, -1, 3].copy(),
+            gains=np.clip(moves, 0, None),
+            losses=np.clip(-moves, 0, None),
+        )
+
+    def update(self, close):
+        """
+        Advance every trajectory by one close (scalar or (n,) array).
+        Returns an (n, 3) array of [RSI, MACD, Signal], the window's
+        feature columns 1-3.
+        """
+        out = np.empty((len(self.last_close), 3))
+
+        self.ema_fast += self._alpha(self.FAST) * (close - self.ema_fast)
+        self.ema_slow += self._alpha(self.SLOW) * (close - self.ema_slow)
+        macd = np.subtract(self.ema_fast, self.ema_slow, out=out[:, 1])
+        self.signal += self._alpha(self.SIGNAL) * (macd - self.signal)
+        out[:, 2] = self.signal
+
+        move = close - self.last_close
+        self.last_close[:] = close
+        self.gains[:, self._pos] = np.maximum(move, 0)
+        self.losses[:, self._pos] = np.maximum(-move, 0)
+        self._pos = (self._pos + 1) % self.RSI_PERIOD
+
+        # Sums instead of averages: same ratio. pandas yields 100 for an
+        # all-gain window; a completely flat window reads as neutral.
+        gain = self.gains.sum(axis=1)
+        loss = self.losses.sum(axis=1)
+        total = gain + loss
+        np.divide(100 * gain, total, out=out[:, 0], where=total > 0)
+        out[total <= 0, 0] = 50.0
+        return out
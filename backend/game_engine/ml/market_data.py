@@ -0,0 +1,175 @@
+"""
+Columnar cache of the historical market CSVs.
+
+The CSV is parsed once into per-ticker NumPy column arrays, which are
+saved next to it as `<name>.npz`. Later loads read the .npz in a few
+milliseconds and skip re-parsing, until the CSV changes. Indicator
+columns missing from the CSV (or blank cells) are derived from Close
+with the same definitions as the training data: pandas
+ewm(adjust=False) EMAs and a simple 14-day RSI.
+
+NumPy only.
+"""
+import csv
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('close', 'rsi', 'macd', 'signal', 'daily_return')
+CSV_COLUMNS = {
+    'close': 'Close',
+    'rsi': 'RSI_14',
+    'macd': 'MACD',
+    'signal': 'Signal_Line',
+    'daily_return': 'Daily_Return_%',
+}
+TICKER_COLUMNS = ('Ticker', 'Symbol')
+
+
+def cache_path(csv_path):
+    return os.path.splitext(str(csv_path))[0] + '.npz'
+
+
+def load_market_data(csv_path, default_ticker, refresh=False):
+    """
+    {ticker: {'date': datetime64[D] array, 'close': ..., 'rsi': ..., ...}}
+    sorted by date. Rows from a CSV without a Ticker/Symbol column are
+    filed under `default_ticker`; with `default_ticker` None such a CSV is
+    a ValueError. Served from the .npz cache unless the CSV changed or
+    `refresh` is set.
+    """
+    csv_path = str(csv_path)
+    stat = os.stat(csv_path)
+    signature = f"{stat.st_mtime_ns}:{stat.st_size}:{default_ticker}"
+    npz_path = cache_path(csv_path)
+
+    if not refresh and os.path.exists(npz_path):
+        try:
+            with np.load(npz_path) as cached:
+                if str(cached['__signature__']) == signature:
+                    return _unpack(cached)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable market data cache %s: %s", npz_path, e)
+
+    data = parse_market_csv(csv_path, default_ticker)
+    arrays = {'__signature__': np.array(signature)}
+    for ticker, columns in data.items():
+        for name, values in columns.items():
+            arrays[f'{ticker}/{name}'] = values
+
+    # Write then rename, so concurrent readers never see a partial file
+    tmp_path = npz_path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, npz_path)
+    return data
+
+
+def _unpack(npz):
+    data = {}
+    for key in npz.files:
+        if key == '__signature__':
+            continue
+        ticker, name = key.rsplit('/', 1)
+        data.setdefault(ticker, {})[name] = npz[key]
+    return data
+
+
+def parse_market_csv(csv_path, default_ticker):
+    """Parse the CSV into per-ticker columns and fill in missing indicators."""
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+
+    index = {name: i for i, name in enumerate(header)}
+    if 'Date' not in index or 'Close' not in index:
+        raise ValueError(f"{csv_path} needs at least Date and Close columns, has {header}")
+    ticker_col = next((index[c] for c in TICKER_COLUMNS if c in index), None)
+    if ticker_col is None and default_ticker is None:
+        raise ValueError(f"{csv_path} has no Ticker/Symbol column; name the ticker its rows belong to")
+
+    def column(name):
+        i = index.get(name)
+        if i is None:
+            return np.full(len(rows), np.nan)
+        return np.array([row[i] if row[i] else 'nan' for row in rows], dtype=np.float64)
+
+    dates = np.array([row[index['Date']][:10] for row in rows], dtype='datetime64[D]')
+    values = {feature: column(name) for feature, name in CSV_COLUMNS.items()}
+    tickers = np.array([row[ticker_col] for row in rows]) if ticker_col is not None else None
+
+    data = {}
+    for ticker in (np.unique(tickers) if tickers is not None else [default_ticker]):
+        mask = tickers == ticker if tickers is not None else slice(None)
+        order = np.argsort(dates[mask], kind='stable')
+        columns = {'date': dates[mask][order]}
+        columns.update({feature: values[feature][mask][order] for feature in FEATURES})
+        derive_features(columns)
+        data[str(ticker)] = columns
+    return data
+
+
+def derive_features(columns):
+    """
+    Fill NaN indicator values in place from `columns['close']`.
+    Present values are kept; only the gaps are derived.
+    """
+    close = columns['close']
+    derived = {
+        'rsi': rsi(close),
+        'macd': ema(close, 12) - ema(close, 26),
+        'daily_return': np.concatenate([[np.nan], np.diff(close) / close[:-1] * 100]),
+    }
+    derived['signal'] = ema(derived['macd'], 9)
+    for name, values in derived.items():
+        missing = np.isnan(columns[name])
+        if missing.any():
+            columns[name] = np.where(missing, values, columns[name])
+    return columns
+
+
+def ema(values, span, block=64):
+    """
+    pandas Series.ewm(span=span, adjust=False).mean(), vectorized.
+
+    Within a block, y[t] = d^(t+1) * y[-1] + a * sum_k d^(t-k) * x[k]
+    (d = 1 - a) is a cumulative sum. Short blocks keep the d^-k
+    weights well inside float64 range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+
+    alpha = 2 / (span + 1)
+    decay = 1 - alpha
+    powers = decay ** np.arange(1, block + 1)
+    inverse = decay ** -np.arange(block)
+
+    prev = values[0] # so that y[0] == x[0], as with adjust=False
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        k = len(chunk)
+        weighted = np.cumsum(chunk * inverse[:k]) * decay ** np.arange(k)
+        out[start:start + k] = powers[:k] * prev + alpha * weighted
+        prev = out[start + k - 1]
+    return out
+
+
+def rsi(close, period=14):
+    """Simple-average RSI over `period` daily moves (first move counts as 0)."""
+    close = np.asarray(close, dtype=np.float64)
+    moves = np.concatenate([[0.0], np.diff(close)])
+    gains = np.concatenate([[0.0], np.cumsum(np.clip(moves, 0, None))])
+    losses = np.concatenate([[0.0], np.cumsum(np.clip(-moves, 0, None))])
+
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        gain = gains[period:] - gains[:-period]
+        loss = losses[period:] - losses[:-period]
+        total = gain + loss
+        out[period - 1:] = np.divide(100 * gain, total, out=np.full(len(total), 50.0), where=total > 0)
+    return out
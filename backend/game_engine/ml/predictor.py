@@ -1,84 +1,98 @@
 import torch
-import joblib
 import logging
 import numpy as np
-import os
 import random
 from django.conf import settings
 from .colab_architecture import StockPredictor
+from .indicators import StreamingIndicators
+from .inference import compile_for_inference, quantize_for_inference
+from .registry import ModelRegistry, model_paths
+from .simulator import MarketSimulator, fallback_path
 
 logger = logging.getLogger(__name__)
 
 class AIStockPredictor:
     """
     Production inference engine for stock predictions.
-    Loads PyTorch model and Scaler once (Singleton pattern).
+    Models and scalers are loaded once per ticker and shared through
+    ModelRegistry (lazy, LRU-bounded).
     """
-    _shared_model = {}
-    _shared_scaler = {}
 
     def __init__(self, ticker='RELIANCE'):
         self.ticker = ticker.upper()
         self.device = torch.device('cpu') # Force CPU for web server deployment
         
         # Paths (Assumes files exist from Colab training)
-        self.model_path = os.path.join(settings.BASE_DIR, f'game_engine/ml/models/{self.ticker.lower()}_model.pth')
-        self.scaler_path = os.path.join(settings.BASE_DIR, f'game_engine/ml/models/{self.ticker.lower()}_scaler.pkl')
-        
-        # Check if already loaded in class/singleton storage
-        if self.ticker in AIStockPredictor._shared_model:
-            self.model = AIStockPredictor._shared_model[self.ticker]
-            self.scaler = AIStockPredictor._shared_scaler[self.ticker]
-        else:
-            self.model = None
-            self.scaler = None
-            self._load_assets()
+        self.model_path, self.scaler_path = model_paths(self.ticker)
+        self.model, self.scaler = ModelRegistry.get(self.ticker)
+        if self.model is None:
+            logger.debug("[%s] Model files not found. Falling back to simulation.", self.ticker)
 
     @classmethod
     def preload_model(cls, ticker='RELIANCE'):
         """Helper to trigger loading without creating an instance."""
-        predictor = cls(ticker) # This triggers _load_assets if not loaded
+        predictor = cls(ticker) # Loads through ModelRegistry if not loaded yet
         return predictor.model is not None
 
-    def _load_assets(self):
-        try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                # Load Scaler
-                scaler = joblib.load(self.scaler_path)
-                
-                # Load Model
-                model = StockPredictor(input_dim=5, hidden_dim=64, num_layers=2, output_dim=1)
-                model.load_state_dict(torch.load(self.model_path, map_location=self.device))
-                model.eval()
-                
-                # Store in Singleton
-                AIStockPredictor._shared_scaler[self.ticker] = scaler
-                AIStockPredictor._shared_model[self.ticker] = model
-                
-                self.scaler = scaler
-                self.model = model
-                logger.info("[%s] AI Model Loaded Successfully.", self.ticker)
-            else:
-                logger.info("[%s] Model files not found. Falling back to simulation.", self.ticker)
-        except Exception as e:
-            logger.error("[%s] Error loading AI model: %s", self.ticker, e)
+    @classmethod
+    def warmup(cls, ticker='RELIANCE'):
+        """Load the model and run a few dummy steps so the first real forecast isn't slow."""
+        predictor = cls(ticker)
+        if predictor.model is not None and hasattr(predictor.model, 'warmup'):
+            predictor.model.warmup()
+        return predictor.model is not None
 
-    def generate_forecast(self, seed_data, months=60):
+    @staticmethod
+    def load_model(model_path, quantize=None, compile=None):
+        """
+        Builds the inference model from a state dict on CPU.
+        quantize / compile default to settings.STOCK_MODEL_QUANTIZE and
+        settings.STOCK_MODEL_COMPILE.
+        """
+        quantize = settings.STOCK_MODEL_QUANTIZE if quantize is None else quantize
+        compile = settings.STOCK_MODEL_COMPILE if compile is None else compile
+
+        model = StockPredictor(input_dim=5, hidden_dim=64, num_layers=2, output_dim=1)
+        model.load_state_dict(torch.load(model_path, map_location='cpu'))
+        model.eval()
+        if quantize:
+            model = quantize_for_inference(model)
+        if compile:
+            model = compile_for_inference(model)
+        return model
+
+    def generate_forecast(self, seed_data, months=60, incremental=True, rng=None, return_context=False):
         """
         Generates a 60-month trajectory based on seed data.
         seed_data: DataFrame or numpy array of shape (60, 5) 
                    Columns: ['Close', 'RSI', 'MACD', 'Signal', 'Return']
+        incremental: Warm the LSTM (h, c) state on the seed window once and
+                     feed one new row per simulated day. False re-runs the
+                     full 60-step window every day (original behaviour).
+        rng: random.Random-like source for the chaos factor (module RNG if None).
+        return_context: Also return the final 60-row window, which seeds the
+                        next chunk when a trajectory is extended later.
         """
         if self.model is None:
             # Fallback to GBM if model missing
-            return self._fallback_generator(seed_data.iloc[-1]['Close'] if hasattr(seed_data, 'iloc') else 100, months)
+            current_context = np.asarray(seed_data, dtype=np.float64)[-60:]
+            trajectory = self._fallback_generator(current_context[-1, 0], months)
+            if not return_context:
+                return trajectory
+            # Carry the simulated price forward so the next chunk continues from it
+            current_context = current_context.copy()
+            current_context[-1, 0] = trajectory[-1]
+            return trajectory, current_context
 
+        rng = rng or random
         trajectory = []
         
         # 1. Prepare Initial Context
         # We need the last 60 days of data to predict Day 1
-        current_context = seed_data.values[-60:] # Ensure we have exactly 60
+        current_context = np.asarray(seed_data, dtype=np.float64)[-60:] # Ensure we have exactly 60
         current_price = current_context[-1, 0] # Assume 'Close' is col 0
+        indicators = StreamingIndicators.from_window(current_context)
+        state = None
         
         # 2. Iterative Prediction Loop
         # Note: We are predicting MONTHLY points using a DAILY model.
@@ -89,22 +103,15 @@ class AIStockPredictor:
         for m_idx in range(months):
             # Run 20 daily steps to simulate 1 month of movement
             for d_idx in range(20): 
-                scaled_input = self.scaler.transform(current_context)
-                tensor_input = torch.from_numpy(scaled_input).float().unsqueeze(0).to(self.device)
-                
-                with torch.no_grad():
-                    # Predict Scaled Close Price
-                    pred_scaled = self.model(tensor_input).item()
+                if state is None or not incremental:
+                    # Full pass over the window (always the case for Day 1)
+                    pred_scaled, state = self._predict(self._scale(current_context))
+                else:
+                    # Only the row appended last step is new; (h, c) carries the rest
+                    pred_scaled, state = self._predict(self._scale(current_context[-1:]), state)
                 
                 # Inverse Transform to get Real Price
-                # We assume the model predicts Column 0 (Close)
-                placeholder = np.zeros((1, 5))
-                placeholder[0, 0] = pred_scaled
-                # Fill other columns with mean values/zeros to avoid scaler complaining if it used them?
-                # StandardScaler/MinMaxScaler usually element-wise.
-                # However, we must ensure we don't accidentally inverse transform using Col 4 params for Col 0.
-                # inverse_transform maps x -> (x - min) / scale
-                pred_price = self.scaler.inverse_transform(placeholder)[0, 0]
+                pred_price = self._inverse_close(pred_scaled)
 
                 # --- CHAOS FACTOR ---
                 # Add noise to the implied return
@@ -114,10 +121,10 @@ class AIStockPredictor:
                     implied_return = 0
 
                 # 5% chance of a "Market Shock" (±3-5%)
-                if random.random() < 0.05:
-                    chaos = random.uniform(-0.05, 0.05)
+                if rng.random() < 0.05:
+                    chaos = rng.uniform(-0.05, 0.05)
                 else:
-                    chaos = random.normalvariate(0, 0.01) # Standard market noise
+                    chaos = rng.normalvariate(0, 0.01) # Standard market noise
                 
                 final_return = implied_return + chaos
                 
@@ -125,12 +132,11 @@ class AIStockPredictor:
                 new_price = current_price * (1 + final_return)
                 
                 # Update Context (Shift window)
-                # We need to construct a new row. 
-                # REALITY CHECK: We can't easily calculate MACD/RSI on the fly without history.
-                # Engineering Shortcut: Reuse previous technicals but update 'Close' and 'Return'.
-                new_row = current_context[-1].copy()
+                # Build the new row; RSI/MACD/Signal advance with the simulated close
+                new_row = np.empty(5)
                 new_row[0] = new_price # Close
-                new_row[4] = final_return # Return
+                new_row[1:4] = indicators.update(new_price)[0] # RSI, MACD, Signal
+                new_row[4] = final_return * 100 # Return (Daily_Return_%, as in training data)
                 
                 # Append and shift
                 current_context = np.vstack([current_context[1:], new_row])
@@ -138,13 +144,206 @@ class AIStockPredictor:
 
             trajectory.append(int(current_price))
 
+        if return_context:
+            return trajectory, current_context
         return trajectory
 
-    def _fallback_generator(self, start_price, months):
-        """Legacy GBM logic for backup"""
-        prices = []
-        curr = start_price
-        for _ in range(months):
-            curr = curr * (1 + random.normalvariate(0.005, 0.05))
-            prices.append(int(curr))
-        return prices
+    def generate_forecast_batch(self, seed_data, months=60, n=1, rng=None):
+        """
+        Vectorized generate_forecast: rolls `n` independent trajectories off
+        the same seed window in one batched, incremental LSTM pass.
+        seed_data may also be an (n, 60, 5) array with one seed window per
+        trajectory (`n` is then taken from it).
+        Returns a float array of shape (n, months) with month-end prices.
+        rng: numpy Generator for the chaos factor.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        seed_data = np.asarray(seed_data, dtype=np.float64)
+        shared = seed_data.ndim == 2
+        if shared:
+            windows = np.broadcast_to(seed_data[-60:], (n, 60, 5))
+        else:
+            windows = seed_data[:, -60:]
+            n = len(windows)
+
+        if self.model is None:
+            # Same GBM as _fallback_generator, all trajectories at once
+            simulator = MarketSimulator(['price'], drift=[0.005], volatility=[0.05])
+            if shared:
+                return simulator.prices([windows[0, -1, 0]], months, n=n, rng=rng)[..., 0]
+            return simulator.prices([1.0], months, n=n, rng=rng)[..., 0] * windows[:, -1, 0][:, None]
+
+        return self._rollout(windows, months, self._numpy_chaos(rng), shared=shared)
+
+    def generate_forecast_many(self, seed_windows, months=60, rngs=None):
+        """
+        Batched generate_forecast(incremental=True, return_context=True) for
+        independent sessions: row i rolls seed_windows[i] forward with its
+        own chaos source rngs[i] (module RNG if None), drawn in the same
+        order as the single path, so each row matches what generate_forecast
+        would return.
+        seed_windows: array-like of shape (n, 60, 5).
+        Returns (list of n int trajectories, (n, 60, 5) final contexts).
+        """
+        windows = np.asarray(seed_windows, dtype=np.float64)[:, -60:]
+        n = len(windows)
+        rngs = [rng or random for rng in rngs] if rngs else [random] * n
+
+        if self.model is None:
+            trajectories, contexts = [], windows.copy()
+            for i in range(n):
+                trajectories.append(self._fallback_generator(windows[i, -1, 0], months))
+                contexts[i, -1, 0] = trajectories[-1][-1]
+            return trajectories, contexts
+
+        trajectories, contexts = self._rollout(windows, months, self._row_chaos(rngs), return_context=True)
+        return [[int(p) for p in path] for path in trajectories], contexts
+
+    def implied_path(self, seed_data, months=60):
+        """
+        Noise-free rollout: the month-end prices the model itself implies
+        from `seed_data`, with no chaos factor. Depends only on the window
+        and the model, so it can be cached and shared across sessions
+        (see ml.client.cached_forecast). Returns (float trajectory, final
+        60-row context), or None without a model.
+        """
+        if self.model is None:
+            return None
+        window = np.asarray(seed_data, dtype=np.float64)[-60:]
+        return self.implied_paths(window[None], months)[0]
+
+    def implied_paths(self, seed_windows, months=60):
+        """
+        Batched implied_path: one noise-free rollout per window in
+        `seed_windows` (n, 60, 5). Returns a list of n (float trajectory,
+        final 60-row context) pairs, or None without a model.
+        """
+        if self.model is None:
+            return None
+        windows = np.asarray(seed_windows, dtype=np.float64)[:, -60:]
+        trajectories, contexts = self._rollout(windows, months, noise=None, return_context=True)
+        return [(trajectories[i].tolist(), contexts[i]) for i in range(len(windows))]
+
+    def _rollout(self, windows, months, noise=None, shared=False, return_context=False):
+        """
+        The batched, incremental LSTM rollout behind generate_forecast_batch,
+        generate_forecast_many and implied_paths.
+        windows: (n, 60, 5) seed windows. shared=True means every row is the
+                 same window: day 1 then runs it once and fans the state out.
+        noise: callable n -> (n,) chaos returns for one simulated day (see
+               _numpy_chaos / _row_chaos); None rolls the noise-free path.
+        Returns the (n, months) float month-end prices, plus the (n, 60, 5)
+        final contexts if return_context.
+        """
+        n = len(windows)
+        current_price = windows[:, -1, 0].copy()
+        last_row = windows[:, -1].copy()
+        indicators = StreamingIndicators.from_window(windows)
+        trajectories = np.empty((n, months))
+        # Ring buffer of the last 60 rows; slot `oldest` is overwritten next
+        context = np.array(windows) if return_context else None
+        oldest = 0
+        state = None
+
+        with torch.no_grad():
+            for m_idx in range(months):
+                for d_idx in range(20):
+                    if state is None and shared:
+                        # Day 1: one pass over the shared window, then fan the state out
+                        tensor_input = torch.from_numpy(self._scale(windows[0])).float().unsqueeze(0)
+                        pred_scaled, (h, c) = self.model.step(tensor_input)
+                        pred_scaled = pred_scaled.expand(n, -1)
+                        state = (h.repeat(1, n, 1), c.repeat(1, n, 1))
+                    elif state is None:
+                        # Day 1: one batched pass over every trajectory's own window
+                        tensor_input = torch.from_numpy(self._scale(windows)).float()
+                        pred_scaled, state = self.model.step(tensor_input)
+                    else:
+                        tensor_input = torch.from_numpy(self._scale(last_row)).float().unsqueeze(1)
+                        pred_scaled, state = self.model.step(tensor_input, state)
+
+                    pred_price = self._inverse_close(pred_scaled[:, 0].numpy().astype(np.float64))
+
+                    # --- CHAOS FACTOR (see generate_forecast) ---
+                    implied_return = np.divide(
+                        pred_price - current_price, current_price,
+                        out=np.zeros(n), where=current_price > 0
+                    )
+                    final_return = implied_return + noise(n) if noise is not None else implied_return
+
+                    current_price = current_price * (1 + final_return)
+                    last_row[:, 0] = current_price # Close
+                    last_row[:, 1:4] = indicators.update(current_price) # RSI, MACD, Signal
+                    last_row[:, 4] = final_return * 100 # Return (%)
+                    if context is not None:
+                        context[:, oldest] = last_row
+                        oldest = (oldest + 1) % 60
+
+                trajectories[:, m_idx] = current_price
+
+        if context is None:
+            return trajectories
+        return trajectories, np.roll(context, -oldest, axis=1)
+
+    @staticmethod
+    def _numpy_chaos(rng):
+        """Vectorized chaos factor for _rollout, drawn from a numpy Generator."""
+        def noise(n):
+            # 5% chance of a "Market Shock" (±3-5%), standard market noise otherwise
+            shock = rng.random(n) < 0.05
+            return np.where(shock, rng.uniform(-0.05, 0.05, n), rng.normal(0, 0.01, n))
+        return noise
+
+    @staticmethod
+    def _row_chaos(rngs):
+        """
+        Chaos factor for _rollout with one random.Random-like source per row,
+        drawn in generate_forecast's order so each row reproduces it.
+        """
+        def draw(rng):
+            if rng.random() < 0.05:
+                return rng.uniform(-0.05, 0.05)
+            return rng.normalvariate(0, 0.01)
+        return lambda n: np.array([draw(rng) for rng in rngs])
+
+    def _scale(self, rows):
+        """
+        scaler.transform() without sklearn's per-call validation overhead,
+        which dominates once each step only feeds a single row.
+        """
+        if hasattr(self.scaler, 'min_') and hasattr(self.scaler, 'scale_'):
+            # MinMaxScaler: x -> x * scale + min
+            return rows * self.scaler.scale_ + self.scaler.min_
+        return self.scaler.transform(rows)
+
+    def _predict(self, scaled_rows, state=None):
+        """
+        Runs the model over `scaled_rows` (Seq_Len, 5) starting from `state`.
+        Returns (scaled close prediction, (h, c)).
+        """
+        tensor_input = torch.from_numpy(scaled_rows).float().unsqueeze(0).to(self.device)
+        
+        with torch.no_grad():
+            # Predict Scaled Close Price
+            pred_scaled, state = self.model.step(tensor_input, state)
+        return pred_scaled.item(), state
+
+    def _inverse_close(self, pred_scaled):
+        """Maps scaled Close prediction(s) back to real price(s)."""
+        # We assume the model predicts Column 0 (Close)
+        # inverse_transform maps x -> (x - min) / scale
+        if hasattr(self.scaler, 'min_') and hasattr(self.scaler, 'scale_'):
+            return (pred_scaled - self.scaler.min_[0]) / self.scaler.scale_[0]
+
+        placeholder = np.zeros((np.size(pred_scaled), 5))
+        placeholder[:, 0] = np.ravel(pred_scaled)
+        # Fill other columns with mean values/zeros to avoid scaler complaining if it used them?
+        # StandardScaler/MinMaxScaler usually element-wise.
+        # However, we must ensure we don't accidentally inverse transform using Col 4 params for Col 0.
+        prices = self.scaler.inverse_transform(placeholder)[:, 0]
+        return prices if np.ndim(pred_scaled) else prices[0]
+
+    @staticmethod
+    def _fallback_generator(start_price, months, rng=None):
+        """Legacy GBM logic for backup (single-asset MarketSimulator path)"""
+        return fallback_path(start_price, months, rng=rng)
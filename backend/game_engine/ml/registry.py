@@ -0,0 +1,155 @@
+"""
+Per-ticker stock model registry.
+
+Maps tickers to their trained model/scaler files, loads them lazily on
+first use, and keeps the loaded set under settings.STOCK_MODEL_CACHE_MB
+by evicting the least recently used model. A ticker that fails to load
+is remembered for settings.STOCK_MODEL_RETRY_SECONDS, so callers fall
+back without retrying (and logging) on every request. Sector -> ticker assignments
+live in GameEngineConfig.CONFIG['SECTOR_MODELS'].
+
+Only the file helpers are safe for processes that never load torch;
+torch/joblib are imported when a model is actually loaded.
+"""
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def model_paths(ticker):
+    """(model .pth, scaler .pkl) paths for a ticker."""
+    base = os.path.join(settings.BASE_DIR, 'game_engine', 'ml', 'models', ticker.lower())
+    return f'{base}_model.pth', f'{base}_scaler.pkl'
+
+
+def has_model(ticker):
+    """True if trained files exist for `ticker` (no loading, no torch)."""
+    return all(os.path.exists(path) for path in model_paths(ticker))
+
+
+class _Entry:
+    __slots__ = ('model', 'scaler', 'nbytes', 'load_ms', 'hits')
+
+    def __init__(self, model, scaler, nbytes, load_ms):
+        self.model = model
+        self.scaler = scaler
+        self.nbytes = nbytes
+        self.load_ms = load_ms
+        self.hits = 0
+
+
+class ModelRegistry:
+    _entries = OrderedDict() # ticker -> _Entry, least recently used first
+    _lock = threading.Lock()
+    _load_locks = {}
+    _failures = {} # ticker -> time.monotonic() of the last failed load
+    _evictions = 0
+
+    @classmethod
+    def get(cls, ticker):
+        """
+        (model, scaler) for `ticker`, loading it on first use, or
+        (None, None) if it has no trained files or fails to load.
+        """
+        ticker = ticker.upper()
+        entry = cls._touch(ticker)
+        if entry is None:
+            if not has_model(ticker) or cls._recently_failed(ticker):
+                return None, None
+            with cls._lock:
+                load_lock = cls._load_locks.setdefault(ticker, threading.Lock())
+            # One loader per ticker; other tickers stay servable meanwhile
+            with load_lock:
+                if cls._recently_failed(ticker):
+                    return None, None
+                entry = cls._touch(ticker) or cls._load(ticker)
+        return (entry.model, entry.scaler) if entry else (None, None)
+
+    @classmethod
+    def _touch(cls, ticker):
+        with cls._lock:
+            entry = cls._entries.get(ticker)
+            if entry is not None:
+                entry.hits += 1
+                cls._entries.move_to_end(ticker)
+            return entry
+
+    @classmethod
+    def _recently_failed(cls, ticker):
+        with cls._lock:
+            failed_at = cls._failures.get(ticker)
+            return failed_at is not None and time.monotonic() - failed_at < settings.STOCK_MODEL_RETRY_SECONDS
+
+    @classmethod
+    def _load(cls, ticker):
+        import joblib
+        from .predictor import AIStockPredictor
+
+        model_path, scaler_path = model_paths(ticker)
+        started = time.perf_counter()
+        try:
+            scaler = joblib.load(scaler_path)
+            model = AIStockPredictor.load_model(model_path)
+        except Exception as e:
+            logger.error(
+                "[%s] Error loading AI model (retrying in %ds): %s", ticker, settings.STOCK_MODEL_RETRY_SECONDS, e
+            )
+            with cls._lock:
+                cls._failures[ticker] = time.monotonic()
+            return None
+        load_ms = (time.perf_counter() - started) * 1000
+
+        entry = _Entry(model, scaler, cls._model_bytes(model), load_ms)
+        with cls._lock:
+            cls._failures.pop(ticker, None)
+            cls._entries[ticker] = entry
+            cls._evict(keep=ticker)
+        logger.info("[%s] AI Model Loaded Successfully (%.0f ms, %.0f KiB).", ticker, load_ms, entry.nbytes / 1024)
+        return entry
+
+    @classmethod
+    def _evict(cls, keep):
+        """Drop least recently used models until under the memory cap. Caller holds _lock."""
+        cap = settings.STOCK_MODEL_CACHE_MB * 1024 * 1024
+        while sum(e.nbytes for e in cls._entries.values()) > cap and len(cls._entries) > 1:
+            ticker = next(iter(cls._entries))
+            if ticker == keep:
+                break
+            cls._entries.pop(ticker)
+            cls._evictions += 1
+            logger.info("[%s] Evicted AI model (memory cap %d MB).", ticker, settings.STOCK_MODEL_CACHE_MB)
+
+    @staticmethod
+    def _model_bytes(model):
+        """Weight memory, measured as the serialized state dict (covers packed int8 weights)."""
+        import torch
+        eager = getattr(model, 'eager', model) # CompiledStockPredictor shares the eager weights
+        buffer = io.BytesIO()
+        torch.save(eager.state_dict(), buffer)
+        return buffer.tell()
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return {
+                'models': {
+                    ticker: {'bytes': e.nbytes, 'load_ms': round(e.load_ms, 1), 'hits': e.hits}
+                    for ticker, e in cls._entries.items()
+                },
+                'bytes': sum(e.nbytes for e in cls._entries.values()),
+                'evictions': cls._evictions,
+                'failed': sorted(cls._failures),
+            }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._failures.clear()
@@ -0,0 +1,114 @@
+import logging
+import random
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from ..models import MarketTickerData
+
+logger = logging.getLogger(__name__)
+
+
+class SeedWindowIndex:
+    """
+    In-memory columnar copy of one ticker's MarketTickerData features, with
+    the start offsets of every usable 60-row seed window precomputed.
+
+    Loaded once per worker (and reloaded after MARKET_WINDOW_INDEX_TTL
+    seconds), so session start picks a random historical window in O(1)
+    instead of running an ORDER BY ... LIMIT query.
+    """
+    FEATURES = ('close', 'rsi', 'macd', 'signal', 'daily_return')
+    WINDOW = 60
+    # Longer calendar gaps than this mean missing data inside the window
+    MAX_GAP_DAYS = 7
+
+    _shared = {}
+    _lock = threading.Lock()
+
+    def __init__(self, ticker, dates, features):
+        self.ticker = ticker
+        self.dates = dates
+        self.features = features
+        self.starts = self._valid_starts(dates, features)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def for_ticker(cls, ticker):
+        index = cls._shared.get(ticker)
+        if index is None or time.monotonic() - index.loaded_at > settings.MARKET_WINDOW_INDEX_TTL:
+            with cls._lock:
+                index = cls._shared.get(ticker)
+                if index is None or time.monotonic() - index.loaded_at > settings.MARKET_WINDOW_INDEX_TTL:
+                    index = cls.load(ticker)
+                    cls._shared[ticker] = index
+        return index
+
+    @classmethod
+    def load(cls, ticker):
+        rows = list(
+            MarketTickerData.objects.filter(ticker=ticker).order_by('date').values_list('date', *cls.FEATURES)
+        )
+        dates = np.array([row[0] for row in rows], dtype='datetime64[D]')
+        features = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, len(cls.FEATURES))
+        index = cls(ticker, dates, features)
+        logger.info("[%s] Seed window index: %d rows, %d windows", ticker, len(rows), len(index.starts))
+        return index
+
+    @classmethod
+    def invalidate(cls, ticker=None):
+        """Drop the cached index (all tickers by default) after reloading ticker data."""
+        with cls._lock:
+            if ticker is None:
+                cls._shared.clear()
+            else:
+                cls._shared.pop(ticker, None)
+
+    @classmethod
+    def _valid_starts(cls, dates, features):
+        """Offsets i where rows i .. i+59 are all finite with no data gaps."""
+        n = len(features)
+        if n < cls.WINDOW:
+            return np.empty(0, dtype=np.int64)
+
+        # Prefix sums: unusable rows, and too-long gaps between rows k and k+1
+        bad_rows = np.concatenate([[0], np.cumsum(~np.isfinite(features).all(axis=1))])
+        gaps = np.concatenate([[0], np.cumsum(np.diff(dates).astype(np.int64) > cls.MAX_GAP_DAYS)])
+
+        starts = np.arange(n - cls.WINDOW + 1)
+        clean_rows = bad_rows[starts + cls.WINDOW] == bad_rows[starts]
+        clean_gaps = gaps[starts + cls.WINDOW - 1] == gaps[starts]
+        return starts[clean_rows & clean_gaps]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def window(self, start):
+        """The (60, 5) feature window starting at row offset `start`."""
+        return self.features[start:start + self.WINDOW]
+
+    def random_window(self, rng=None):
+        """A uniformly chosen valid window, or None if the ticker has none."""
+        if not len(self.starts):
+            return None
+        start = self.starts[(rng or random).randrange(len(self.starts))]
+        return self.window(start)
+
+    def sample_windows(self, n, rng):
+        """
+        `n` windows drawn uniformly with replacement, as an (n, 60, 5)
+        array (random_window, vectorized). rng: numpy Generator.
+        None if the ticker has no windows.
+        """
+        if not len(self.starts):
+            return None
+        starts = self.starts[rng.integers(len(self.starts), size=n)]
+        return self.features[starts[:, None] + np.arange(self.WINDOW)]
+
+    def latest_window(self):
+        """The most recent valid window, or None."""
+        if not len(self.starts):
+            return None
+        return self.window(self.starts[-1])
@@ -0,0 +1,94 @@
+"""
+Vectorized, seeded multi-asset market simulator.
+
+Simulates stock sectors and mutual-fund NAVs together as correlated
+geometric Brownian motion: a whole horizon of monthly returns is drawn
+as one (n, months, assets) block from a multivariate normal built from
+per-asset drift/volatility and a correlation matrix.
+
+NumPy only - safe to import in processes that never load torch.
+"""
+import numpy as np
+
+
+class MarketSimulator:
+    """Correlated monthly-return generator for a fixed list of assets."""
+
+    def __init__(self, assets, drift, volatility, correlation=None):
+        self.assets = list(assets)
+        self.drift = np.asarray(drift, dtype=np.float64)
+        volatility = np.asarray(volatility, dtype=np.float64)
+        if correlation is None:
+            correlation = np.eye(len(self.assets))
+        self.covariance = np.asarray(correlation, dtype=np.float64) * np.outer(volatility, volatility)
+        self._factor = self._cholesky(self.covariance)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Builds the simulator for every sector and mutual fund in the game
+        config (GameEngineConfig.CONFIG). Fund assets are named 'MF_<KEY>',
+        matching their keys in session.market_prices.
+        """
+        sim = config['MARKET_SIMULATION']
+        assets, drift, volatility = [], [], []
+
+        for sector in config['STOCK_SECTORS']:
+            assets.append(sector)
+            drift.append(sim['SECTOR_DRIFT'])
+            volatility.append(sim['SECTOR_VOLATILITY'])
+
+        for fund_key, fund in config['MUTUAL_FUNDS'].items():
+            assets.append(f"MF_{fund_key}")
+            drift.append(sim['NAV_DRIFT'])
+            volatility.append(fund['volatility'])
+
+        correlation = np.eye(len(assets))
+        for (a, b), rho in sim['CORRELATIONS'].items():
+            if a in assets and b in assets:
+                i, j = assets.index(a), assets.index(b)
+                correlation[i, j] = correlation[j, i] = rho
+
+        return cls(assets, drift, volatility, correlation)
+
+    @staticmethod
+    def _cholesky(covariance):
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            # Hand-tuned correlations can end up slightly indefinite;
+            # clip negative eigenvalues to get the nearest usable matrix.
+            values, vectors = np.linalg.eigh(covariance)
+            clipped = vectors @ np.diag(np.clip(values, 1e-12, None)) @ vectors.T
+            return np.linalg.cholesky(clipped)
+
+    def returns(self, months, n=None, rng=None):
+        """
+        Monthly simple returns, shape (months, assets), or
+        (n, months, assets) when `n` is given.
+        rng: numpy Generator or seed (e.g. [session_seed, start_month]).
+        """
+        rng = np.random.default_rng(rng)
+        shape = (months, len(self.assets)) if n is None else (n, months, len(self.assets))
+        return self.drift + rng.standard_normal(shape) @ self._factor.T
+
+    def prices(self, start_prices, months, n=None, rng=None):
+        """
+        Month-end price paths starting from `start_prices` (one per asset),
+        same shape as returns().
+        """
+        growth = np.cumprod(1 + self.returns(months, n=n, rng=rng), axis=-2)
+        return np.asarray(start_prices, dtype=np.float64) * growth
+
+    def column(self, asset):
+        return self.assets.index(asset)
+
+
+def fallback_path(start_price, months, rng=None):
+    """
+    Single-asset GBM month-end prices (ints) - the forecast used whenever
+    the LSTM model isn't available.
+    """
+    simulator = MarketSimulator(['price'], drift=[0.005], volatility=[0.05])
+    path = simulator.prices([start_price], months, rng=rng)[:, 0]
+    return [int(p) for p in path]
@@ -0,0 +1,73 @@
+"""
+Training data pipeline for StockPredictor (see `manage.py train_stock_model`).
+"""
+import random
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, Sampler
+
+
+class WindowDataset(Dataset):
+    """
+    Sliding windows over a scaled (rows, 5) feature matrix. Item i is a
+    window ending at some row e and the next row's scaled Close as target.
+
+    Windows come in several lengths ("mixed windowing"). Inference warms
+    the LSTM on 60 rows and then keeps stepping the same state for
+    hundreds of rows, so training also on windows longer than 60 teaches
+    the model to stay stable over that longer context.
+    """
+
+    def __init__(self, features, ends, lengths):
+        self.features = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+        self.items = [(end, length) for length in lengths for end in ends if end - length >= 0]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        end, length = self.items[i]
+        return self.features[end - length:end], self.features[end, :1]
+
+    def lengths(self):
+        return [length for _, length in self.items]
+
+
+class LengthGroupedSampler(Sampler):
+    """Shuffled batches in which every window has the same length, so they stack."""
+
+    def __init__(self, lengths, batch_size, shuffle=True, seed=0):
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        self.groups = {}
+        for i, length in enumerate(lengths):
+            self.groups.setdefault(length, []).append(i)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _batches(self):
+        rng = random.Random(self.seed + self.epoch)
+        batches = []
+        for indices in self.groups.values():
+            indices = list(indices)
+            if self.shuffle:
+                rng.shuffle(indices)
+            batches.extend(indices[i:i + self.batch_size] for i in range(0, len(indices), self.batch_size))
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def __iter__(self):
+        return iter(self._batches())
+
+    def __len__(self):
+        return sum(-(-len(g) // self.batch_size) for g in self.groups.values())
+
+
+def worker_init(worker_id):
+    # Loader workers only slice tensors; keep them from competing with the training threads
+    torch.set_num_threads(1)
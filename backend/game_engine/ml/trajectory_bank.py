@@ -0,0 +1,153 @@
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TrajectoryBank:
+    """
+    Precomputed multi-sector market trajectories.
+
+    Prices live in a (count, months, assets) float32 `.npy` file that is
+    memory-mapped read-only, so every worker process shares the same
+    page-cache pages instead of holding its own copy. A (count, assets)
+    file alongside holds the price each row starts from (month 0, before
+    the first stored month). A JSON sidecar records the asset column
+    order, a bank id and the data files, which are named after the bank
+    id: a rebuild writes new data files and swaps the sidecar last, so
+    readers never pair new prices with old metadata.
+    Built offline with `manage.py build_trajectory_bank`.
+    """
+    _shared = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.bank_id = meta['bank_id']
+        self.assets = meta['assets']
+        # Banks built before versioned data files keep their prices at `path`
+        data = meta.get('data')
+        data_path = os.path.join(os.path.dirname(path), data) if data else path
+        self.prices = np.load(data_path, mmap_mode='r')
+        self.count, self.months, _ = self.prices.shape
+        # Banks built before start prices were recorded have none
+        starts = meta.get('starts')
+        self.starts = np.load(os.path.join(os.path.dirname(path), starts), mmap_mode='r') if starts else None
+
+    @staticmethod
+    def meta_path(path):
+        return os.path.splitext(str(path))[0] + '.json'
+
+    @staticmethod
+    def data_path(path, bank_id, kind=None):
+        suffix = f'.{kind}' if kind else ''
+        return f"{os.path.splitext(str(path))[0]}.{bank_id}{suffix}.npy"
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Returns the bank at `path` (settings.MARKET_TRAJECTORY_BANK by
+        default), or None if it hasn't been built. Reopened automatically
+        when the file is rebuilt.
+        """
+        path = str(path or settings.MARKET_TRAJECTORY_BANK)
+        meta_path = cls.meta_path(path)
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = cls._shared.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with cls._lock:
+            try:
+                with open(meta_path) as f:
+                    bank = cls(path, json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error("Could not open trajectory bank %s: %s", path, e)
+                return None
+            cls._shared[path] = (mtime, bank)
+            logger.info("Trajectory bank loaded: %d x %d months (%s)", bank.count, bank.months, path)
+            return bank
+
+    def covers(self, assets, months):
+        """True if every asset has a column and rows span `months`."""
+        return self.months >= months and all(a in self.assets for a in assets)
+
+    def series(self, row, asset, start, months):
+        """Integer prices for `asset` in months start+1 .. start+months of `row`."""
+        column = self.assets.index(asset)
+        return [int(p) for p in self.prices[row, start:start + months, column]]
+
+    @classmethod
+    def create(cls, path, assets, count, months):
+        """
+        Opens a writable bank next to `path`. Fill `writer.prices` and
+        `writer.starts` and call `commit()`; the live bank is only replaced
+        once the write completes.
+        """
+        return _BankWriter(str(path), assets, count, months)
+
+
+class _BankWriter:
+    def __init__(self, path, assets, count, months):
+        self.path = path
+        bank_id = uuid.uuid4().hex
+        # Nothing reads this file until commit() points the sidecar at it
+        self.data_path = TrajectoryBank.data_path(path, bank_id)
+        self.starts_path = TrajectoryBank.data_path(path, bank_id, 'starts')
+        self.meta = {
+            'bank_id': bank_id,
+            'assets': list(assets),
+            'count': count,
+            'months': months,
+            'data': os.path.basename(self.data_path),
+            'starts': os.path.basename(self.starts_path),
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.prices = np.lib.format.open_memmap(
+            self.data_path, mode='w+', dtype=np.float32, shape=(count, months, len(assets))
+        )
+        self.starts = np.lib.format.open_memmap(
+            self.starts_path, mode='w+', dtype=np.float32, shape=(count, len(assets))
+        )
+
+    def commit(self, **extra_meta):
+        self.prices.flush()
+        self.starts.flush()
+        del self.prices, self.starts
+
+        # The sidecar swap is the single switch-over point
+        meta_path = TrajectoryBank.meta_path(self.path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({**self.meta, **extra_meta}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        self._remove_old_data()
+        return self.meta['bank_id']
+
+    def _remove_old_data(self):
+        """
+        Delete data (and start price) files of replaced banks. Workers that still have one
+        mapped keep reading it until they reopen (POSIX); where the file is
+        in use and can't be removed, it is left for the next build.
+        """
+        old = glob.glob(TrajectoryBank.data_path(glob.escape(self.path), '*'))
+        if os.path.exists(self.path):
+            old.append(self.path)
+        for path in old:
+            if path in (self.data_path, self.starts_path):
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning("Could not remove old trajectory bank data %s: %s", path, e)
@@ -80,6 +80,12 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 # --- 2. GAME SESSION (EVOLVED) ---
+def default_expected_income():
+    """A session without IncomeSource rows earns the configured monthly salary."""
+    from .services.config import GameEngineConfig
+    return GameEngineConfig.CONFIG['MONTHLY_SALARY']
+
+
 class GameSession(models.Model):
     """Tracks the user's current run through the game."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_sessions')
@@ -100,6 +106,8 @@ class GameSession(models.Model):
     # --- NEW: Stock Market 2.0 ---
     # Market prices for each sector (starts at 100)
     market_prices = models.JSONField(default=dict)  # {"gold": 100, "tech": 100, "real_estate": 100}
+    # False while a new session's market history is generated in the background
+    market_ready = models.BooleanField(default=True)
     # Market trends (Momentum) - stores integer -5 to +5 indicating current trend
     market_trends = models.JSONField(default=dict)  # {"gold": 2, "tech": -5, "real_estate": 0}
     # Player's portfolio (units held per sector)
@@ -108,13 +116,23 @@ class GameSession(models.Model):
     mutual_funds = models.JSONField(default=dict)
     # NEW: IPO Applications - [{"name": "Zomato", "amount": 15000, "status": "APPLIED", "month": 5}]
     active_ipos = models.JSONField(default=list)
+    # Value of stocks + mutual funds + pending IPOs, kept current by ValuationService
+    portfolio_value = models.FloatField(default=0)
     
-    # NEW: Purchase history for profit calculation
-    purchase_history = models.JSONField(default=list)  # [{"sector": "tech", "units": 10, "price": 100, "month": 1}]
+    # Average-cost position per sector for P&L (see ValuationService)
+    cost_basis = models.JSONField(default=dict)  # {"tech": {"units": 10, "cost": 1000, "realized": 0}}
     
     # --- NEW: Recurring Expenses ---
-    # This acts as a CACHE for the total monthly drain, updated by advance_month
-    recurring_expenses = models.IntegerField(default=0)
+    # Cash-flow counters, updated in the database (F() / queryset update)
+    # wherever expenses / income sources change (see
+    # GameService._track_expenses / _refresh_income), so the month tick and
+    # the chatbot triggers don't recompute them.
+    recurring_expenses = models.IntegerField(default=0)  # Total monthly bills
+    essential_expenses = models.IntegerField(default=0)  # Part of the bills marked essential
+    debt_emi = models.IntegerField(default=0)  # Part of the bills in the DEBT category
+    expected_income = models.IntegerField(default=default_expected_income)  # Monthly income if every source pays (salary if none)
+    freelance_income = models.IntegerField(default=0)  # Part of expected_income that is freelance
+    income_source_count = models.IntegerField(default=0)  # 0: the default salary, no IncomeSource rows
 
     # --- NEW: Gameplay Log & Final Report ---
     gameplay_log = models.TextField(blank=True, default="")
@@ -123,6 +141,11 @@ class GameSession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    CASH_FLOW_COUNTERS = (
+        'recurring_expenses', 'essential_expenses', 'debt_emi',
+        'expected_income', 'freelance_income', 'income_source_count',
+    )
+
     def save(self, *args, **kwargs):
         # Initialize market prices if empty
         if not self.market_prices:
@@ -135,6 +158,10 @@ class GameSession(models.Model):
     def __str__(self):
         return f"Session {self.id} - User: {self.user.username} - Month: {self.current_month}"
 
+    @property
+    def lifestyle_expenses(self):
+        return self.recurring_expenses - self.essential_expenses
+
     class Meta:
         ordering = ['-created_at']
 
@@ -191,10 +218,13 @@ class StockHistory(models.Model):
     """
     Stores the PRE-GENERATED price trajectory for the entire game session.
     This is the 'Ground Truth' that the ML model predicts.
+
+    Legacy: sessions with a MarketTrajectory keep their prices packed in
+    MarketTrajectory.prices; these rows remain only for older sessions.
     """
     session = models.ForeignKey(GameSession, on_delete=models.CASCADE, related_name='market_history')
     sector = models.CharField(max_length=50) # 'tech', 'gold', 'real_estate'
-    month = models.IntegerField() # 1 to 12
+    month = models.IntegerField() # 1 to GAME_DURATION_MONTHS, generated in chunks
     price = models.IntegerField()
     
     # ML Confidence Metrics (Optional for UI)
@@ -204,6 +234,38 @@ class StockHistory(models.Model):
         ordering = ['session', 'month']
         unique_together = ('session', 'sector', 'month')
 
+class MarketTrajectory(models.Model):
+    """
+    A session's market history, packed into one row, and its generation cursor.
+    History is produced in chunks as the game progresses; `state` carries
+    each sector's generator state (last price, LSTM context window) from
+    one chunk to the next. Fund NAV moves are simulated alongside.
+    """
+    session = models.OneToOneField(GameSession, on_delete=models.CASCADE, related_name='market_trajectory')
+    horizon = models.IntegerField(default=0) # Last month generated
+    state = models.JSONField(default=dict) # {"tech": {"engine": "lstm", "price": 512.3, "context": [[...]]}, ...}
+    seed = models.BigIntegerField(null=True, blank=True) # Per-session simulator seed
+    # Monthly mutual fund NAV returns, index 0 = month 1: {"MF_NIFTY50": [0.01, -0.004, ...]}
+    fund_returns = models.JSONField(default=dict)
+    # Monthly sector prices, index 0 = month 1: {"tech": [512, 530, ...]}
+    prices = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Session {self.session_id} market generated to month {self.horizon}"
+
+    def prices_at(self, month):
+        """{sector: price} for one month (1-based); sectors not generated that far are left out."""
+        return {sector: series[month - 1] for sector, series in self.prices.items() if 0 < month <= len(series)}
+
+    def price_history(self, through_month):
+        """Columnar history for months 1..through_month: {'months': [1, 2, ...], 'tech': [...], ...}."""
+        columns = {sector: series[:through_month] for sector, series in self.prices.items()}
+        history = {'months': list(range(1, max(map(len, columns.values()), default=0) + 1))}
+        history.update(columns)
+        return history
+
+
 class FuturesContract(models.Model):
     """
     Represents a 'Short Selling' hedge.
@@ -216,11 +278,17 @@ class FuturesContract(models.Model):
     spot_price_at_sale = models.IntegerField() # Reference for analytics
     duration_months = models.IntegerField()
     created_month = models.IntegerField()
+    maturity_month = models.IntegerField() # created_month + duration_months; settled in that month's tick
     
     # Profit/Loss calculation (Virtual, since cash is immediate)
     final_market_price = models.IntegerField(null=True, blank=True)
     is_successful = models.BooleanField(default=False) # True if Strike > Final Price
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'maturity_month']),
+        ]
+
     def __str__(self):
         return f"{self.sector} Future - {self.units}u @ {self.strike_price}"
 
@@ -372,6 +440,7 @@ class MarketTickerData(models.Model):
 
     class Meta:
         ordering = ['date']
-        indexes = [
-            models.Index(fields=['ticker', 'date']),
+        constraints = [
+            # One row per trading day; seed_market_data upserts on it
+            models.UniqueConstraint(fields=['ticker', 'date'], name='unique_ticker_date'),
         ]
@@ -3,6 +3,7 @@ from .models import (
     GameSession, ScenarioCard, Choice, RecurringExpense,
     PlayerProfile, GameHistory, MarketEvent, PersonaProfile, IncomeSource
 )
+from .services.valuation_service import ValuationService
 
 
 
@@ -113,6 +114,7 @@ class GameSessionSerializer(serializers.ModelSerializer):
     active_expenses = serializers.SerializerMethodField()
     income_sources = serializers.SerializerMethodField()
     persona_profile = PersonaProfileSerializer(read_only=True)
+    net_worth = serializers.SerializerMethodField()
 
     class Meta:
         model = GameSession
@@ -121,11 +123,18 @@ class GameSessionSerializer(serializers.ModelSerializer):
             'happiness', 'credit_score', 'financial_literacy', 
             'lifelines', 'is_active',
             'real_estate_holdings', 'gold_holdings', 'current_level',
-            'market_prices', 'portfolio', 'recurring_expenses',
+            'market_prices', 'market_ready', 'portfolio', 'recurring_expenses',
+            'essential_expenses', 'lifestyle_expenses', 'debt_emi', 'expected_income',
             'persona_profile', 'income_sources', 'active_expenses',
-            'mutual_funds', 'active_ipos',
+            'mutual_funds', 'active_ipos', 'portfolio_value', 'net_worth',
         ]
-        read_only_fields = ['id', 'username', 'financial_literacy', 'lifelines']
+        read_only_fields = [
+            'id', 'username', 'financial_literacy', 'lifelines', 'market_ready', 'portfolio_value',
+            'recurring_expenses', 'essential_expenses', 'debt_emi', 'expected_income',
+        ]
+
+    def get_net_worth(self, obj):
+        return ValuationService.net_worth(obj)
 
     def get_active_expenses(self, obj):
         expenses = obj.expenses.filter(is_cancelled=False)
@@ -8,13 +8,14 @@ from .game_service import GameService
 from .market_service import MarketService
 from .advisor_service import AdvisorService
 from .report_service import ReportService
+from .valuation_service import ValuationService
 
 
-class GameEngine(GameService, MarketService, AdvisorService, ReportService):
+class GameEngine(GameService, MarketService, AdvisorService, ReportService, ValuationService):
     """
     Unified GameEngine facade.
 
-    Inherits all static methods from the four service modules so that
+    Inherits all static methods from the service modules so that
     every existing call site (``GameEngine.start_new_session(...)``,
     ``GameEngine.buy_stock(...)``, etc.) keeps working without any
     import changes.
@@ -7,7 +7,6 @@ and processing scam choices.
 import random
 import logging
 
-from ..models import RecurringExpense
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE, get_advisor, AdvisorPersona
 from .config import GameEngineConfig
 
@@ -49,22 +48,13 @@ class AdvisorService:
         CONFIG = GameEngineConfig.CONFIG
         advisor = get_advisor()
 
-        # --- Calculate Net Worth ---
-        portfolio_value = 0
-        portfolio_empty = True
-        if session.portfolio and session.market_prices:
-            for sector, units in session.portfolio.items():
-                if units > 0:
-                    portfolio_empty = False
-                price = session.market_prices.get(sector, 0)
-                portfolio_value += int(units * price)
-        net_worth = session.wealth + portfolio_value
+        # --- Net Worth ---
+        from . import GameEngine
+        portfolio_empty = session.portfolio_value <= 0
+        net_worth = GameEngine.net_worth(session)
 
         # --- Calculate Debt Ratio ---
-        debt_expenses = RecurringExpense.objects.filter(
-            session=session, category='DEBT', is_cancelled=False
-        )
-        total_debt_emi = sum(e.amount for e in debt_expenses)
+        total_debt_emi = session.debt_emi
         debt_ratio = total_debt_emi / max(net_worth, 1) if net_worth > 0 else 1.0
 
         # --- 1. VASOOLI BHAI: Debt Crisis ---
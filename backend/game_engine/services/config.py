@@ -22,6 +22,43 @@ class GameEngineConfig:
         'MAX_CREDIT': 900,
         'MONTHLY_SALARY': 25000,
         'STOCK_SECTORS': ['gold', 'tech', 'real_estate'],
+        # Forecast model per sector (ml/models/<ticker>_model.pth, seeded from
+        # MarketTickerData '<ticker>.NS'); sectors without trained files use GBM.
+        # Only RELIANCE ships with the repo: gold and real_estate stay on GBM
+        # until `train_stock_model --ticker GOLDBEES.NS --activate` (or DLF.NS) is run.
+        'SECTOR_MODELS': {'tech': 'RELIANCE', 'gold': 'GOLDBEES', 'real_estate': 'DLF'},
+        'SECTOR_START_PRICES': {'gold': 1800, 'tech': 500, 'real_estate': 300},
+        # Market history is generated lazily: one chunk at session start,
+        # the next in the background once fewer than PREFETCH months remain.
+        'MARKET_CHUNK_MONTHS': 12,
+        'MARKET_PREFETCH_MONTHS': 3,
+        # Upper bound on orders in one market/orders/ batch
+        'MAX_BATCH_ORDERS': 20,
+        # Correlated GBM for sectors without a forecast model and for fund
+        # NAVs (see ml/simulator.py). Drift/volatility are monthly; fund
+        # volatility comes from MUTUAL_FUNDS.
+        'MARKET_SIMULATION': {
+            'SECTOR_DRIFT': 0.005,
+            'SECTOR_VOLATILITY': 0.05,
+            'NAV_DRIFT': 0.008,
+            'CORRELATIONS': {
+                ('gold', 'tech'): -0.2,
+                ('gold', 'real_estate'): 0.1,
+                ('tech', 'real_estate'): 0.3,
+                ('MF_NIFTY50', 'tech'): 0.6,
+                ('MF_MIDCAP', 'tech'): 0.5,
+                ('MF_SMALLCAP', 'tech'): 0.4,
+                ('MF_NIFTY50', 'real_estate'): 0.2,
+                ('MF_MIDCAP', 'real_estate'): 0.2,
+                ('MF_SMALLCAP', 'real_estate'): 0.2,
+                ('MF_NIFTY50', 'gold'): -0.1,
+                ('MF_MIDCAP', 'gold'): -0.1,
+                ('MF_SMALLCAP', 'gold'): -0.1,
+                ('MF_NIFTY50', 'MF_MIDCAP'): 0.8,
+                ('MF_NIFTY50', 'MF_SMALLCAP'): 0.7,
+                ('MF_MIDCAP', 'MF_SMALLCAP'): 0.85,
+            },
+        },
         'LEVEL_THRESHOLDS': [
             {'level': 1, 'min_month': 1, 'min_literacy': 0, 'desc': 'The Basics'},
             {'level': 2, 'min_month': 6, 'min_literacy': 20, 'desc': 'Credit & Debt'},
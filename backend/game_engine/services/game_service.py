@@ -11,12 +11,13 @@ import uuid
 
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
+from django.db.models import Count, F, Q, Sum
 
+from .. import background
 from ..models import (
     GameSession, PlayerChoice, RecurringExpense, ScenarioCard,
-    StockHistory, IncomeSource, MarketTickerData
+    IncomeSource
 )
-from ..ml.predictor import AIStockPredictor
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE, get_advisor, AdvisorPersona
 from ..ai_engine import get_ai_master
 
@@ -42,76 +43,25 @@ class GameService:
     @staticmethod
     def start_new_session(user):
         """Initialize a new game session with defaults."""
+        from . import GameEngine
         CONFIG = GameEngineConfig.CONFIG
 
-        session = GameSession.objects.create(
+        market_prices = {s: CONFIG['SECTOR_START_PRICES'].get(s, 100) for s in CONFIG['STOCK_SECTORS']}
+        market_prices.update({f"MF_{mf_key}": 100 for mf_key in CONFIG['MUTUAL_FUNDS']})
+
+        session = GameSession(
             user=user,
             wealth=CONFIG['STARTING_WEALTH'],
             happiness=CONFIG['HAPPINESS_START'],
             credit_score=CONFIG['CREDIT_SCORE_START'],
-            current_month=CONFIG['START_MONTH']
+            current_month=CONFIG['START_MONTH'],
+            market_trends={s: 0 for s in CONFIG['STOCK_SECTORS']},
+            portfolio={s: 0 for s in CONFIG['STOCK_SECTORS']},
+            # Placeholder sector prices until the market is ready (see ensure_market_ready)
+            market_prices=market_prices,
+            market_ready=False,
         )
         session.current_level = GameService._calculate_level(session)
-        session.market_trends = {s: 0 for s in CONFIG['STOCK_SECTORS']}
-        session.save()
-
-        # --- Generate Deterministic Market History ---
-        ticker = 'RELIANCE.NS'
-        seed_qs = MarketTickerData.objects.filter(ticker=ticker).order_by('-date')[:60]
-
-        initial_prices = {}
-
-        if seed_qs.count() < 60:
-            logger.warning("Insufficient seed data for AI. Using fallback simulation.")
-            initial_prices = {"gold": 1800, "tech": 500, "real_estate": 300}
-
-            for sector in CONFIG['STOCK_SECTORS']:
-                prices = [initial_prices.get(sector, 100) for _ in range(12)]
-                history_objs = [
-                    StockHistory(session=session, sector=sector, month=i + 1, price=p)
-                    for i, p in enumerate(prices)
-                ]
-                StockHistory.objects.bulk_create(history_objs)
-        else:
-            import pandas as pd
-            seed_data = pd.DataFrame(list(seed_qs.values(
-                'close', 'rsi', 'macd', 'signal', 'daily_return'
-            )))
-            seed_data = seed_data.iloc[::-1]
-
-            predictor = AIStockPredictor(ticker='RELIANCE')
-            tech_prices = predictor.generate_forecast(seed_data, months=12)
-
-            history_objs = [
-                StockHistory(session=session, sector='tech', month=i + 1, price=p)
-                for i, p in enumerate(tech_prices)
-            ]
-
-            gold_prices = predictor._fallback_generator(1800, 12)
-            history_objs += [
-                StockHistory(session=session, sector='gold', month=i + 1, price=p)
-                for i, p in enumerate(gold_prices)
-            ]
-
-            re_prices = predictor._fallback_generator(300, 12)
-            history_objs += [
-                StockHistory(session=session, sector='real_estate', month=i + 1, price=p)
-                for i, p in enumerate(re_prices)
-            ]
-
-            StockHistory.objects.bulk_create(history_objs)
-
-            initial_prices['tech'] = tech_prices[0]
-            initial_prices['gold'] = gold_prices[0]
-            initial_prices['real_estate'] = re_prices[0]
-
-        # Initialize Mutual Fund NAVs
-        for mf_key in CONFIG['MUTUAL_FUNDS']:
-            initial_prices[f"MF_{mf_key}"] = 100
-
-        session.market_prices = initial_prices
-        session.portfolio = {s: 0 for s in CONFIG['STOCK_SECTORS']}
-        session.save()
 
         # --- Initialize Monthly Bills ---
         default_expenses = [
@@ -120,10 +70,8 @@ class GameService:
             {'name': 'Utilities (Electricity/Water)', 'amount': 1000, 'category': 'UTILITIES', 'is_essential': True, 'inflation': 0.03},
             {'name': 'Transport (Metro/Bus)', 'amount': 1000, 'category': 'TRANSPORT', 'is_essential': True, 'inflation': 0.05}
         ]
-
-        for exp in default_expenses:
-            RecurringExpense.objects.create(
-                session=session,
+        expenses = [
+            RecurringExpense(
                 name=exp['name'],
                 amount=exp['amount'],
                 category=exp['category'],
@@ -131,6 +79,17 @@ class GameService:
                 inflation_rate=exp['inflation'],
                 started_month=session.current_month
             )
+            for exp in default_expenses
+        ]
+        GameService._track_expenses(session, expenses)
+        session.save()
+
+        # --- Generate Market History in the background; the first card doesn't need it ---
+        background.submit(GameEngine.open_market, session.id, key=f"market-history:{session.id}")
+
+        for expense in expenses:
+            expense.session = session
+        RecurringExpense.objects.bulk_create(expenses)
 
         return session
 
@@ -258,7 +217,7 @@ class GameService:
 
         # 2. Handle Recurring Expenses (Add/Remove)
         if choice.adds_recurring_expense > 0:
-            RecurringExpense.objects.create(
+            expense = RecurringExpense.objects.create(
                 session=session,
                 name=choice.expense_name or f"Expense from '{card.title}'",
                 amount=choice.adds_recurring_expense,
@@ -267,18 +226,20 @@ class GameService:
                 inflation_rate=0.04,
                 started_month=session.current_month
             )
+            GameService._track_expenses(session, [expense])
 
         if choice.cancels_expense_name:
-            expenses = session.expenses.filter(
+            cancelled = list(session.expenses.filter(
                 name=choice.cancels_expense_name,
                 is_cancelled=False
-            )
-            count = expenses.update(
-                is_cancelled=True,
-                cancelled_month=session.current_month
-            )
-            if count > 0:
-                feedback_parts.append(f" (Cancelled {count} subscription(s)!)")
+            ))
+            if cancelled:
+                RecurringExpense.objects.filter(pk__in=[e.pk for e in cancelled]).update(
+                    is_cancelled=True,
+                    cancelled_month=session.current_month
+                )
+                GameService._track_expenses(session, cancelled, sign=-1)
+                feedback_parts.append(f" (Cancelled {len(cancelled)} subscription(s)!)")
 
         # 3. Handle Market Events
         if card.market_event and card.market_event.is_active:
@@ -291,7 +252,7 @@ class GameService:
                     if sector in session.market_prices:
                         old_price = session.market_prices[sector]
                         new_price = int(old_price * multiplier)
-                        session.market_prices[sector] = new_price
+                        GameEngine._apply_prices(session, {sector: new_price})
 
                         trend_impact = 3 if multiplier > 1 else -3
                         session.market_trends[sector] = trend_impact
@@ -397,18 +358,26 @@ class GameService:
         from . import GameEngine
         CONFIG = GameEngineConfig.CONFIG
 
+        # Month 1 prices must be in place before the market moves
+        GameEngine.ensure_market_ready(session)
+
         # 1. Advance Time
         session.current_month += 1
         report_lines = [f"📅 Month {session.current_month} Started!"]
         GameService._refresh_level(session)
 
-        # 2. Income Processing
-        total_income = 0
+        # Counters may have moved since this instance was loaded
+        session.refresh_from_db(fields=GameSession.CASH_FLOW_COUNTERS)
+
+        # 2. Income Processing (fixed income from the counters; the rows are
+        # only read for their labels and freelance rolls, if there are any)
+        total_income = session.expected_income - session.freelance_income
         income_report_lines = []
 
-        income_sources = IncomeSource.objects.filter(session=session)
+        if not session.income_source_count:
+            income_report_lines.append(f"+₹{total_income} Salary credited.")
 
-        for source in income_sources:
+        for source in (session.income_sources.all() if session.income_source_count else []):
             amount = source.amount_base
 
             if source.source_type == IncomeSource.SourceType.FREELANCE:
@@ -418,37 +387,32 @@ class GameService:
                     income_report_lines.append("⚠️ No Freelance gig this month.")
                 else:
                     amount = int(source.amount_base * random.uniform(0.8, 1.2))
+                total_income += amount
 
             if amount > 0:
-                total_income += amount
                 income_report_lines.append(f"+₹{amount} from {source.get_source_type_display()}")
 
-        if not income_sources.exists():
-            total_income = CONFIG['MONTHLY_SALARY']
-            income_report_lines.append(f"+₹{total_income} Salary credited.")
-
         session.wealth += total_income
         report_lines.extend(income_report_lines)
 
-        # 3. Recurring Expenses & Inflation
-        active_expenses = session.expenses.filter(is_cancelled=False)
-        total_monthly_drain = 0
+        # 3. Recurring Expenses & Inflation (bills come from the counters;
+        # expenses are only fetched in inflation months, with one bulk update)
         bill_report_lines = []
 
         apply_inflation = (session.current_month > 1) and (session.current_month % 12 == 1)
 
-        for expense in active_expenses:
-            if apply_inflation and expense.inflation_rate > 0:
-                old_amount = expense.amount
-                new_amount = int(old_amount * (1 + expense.inflation_rate))
-                expense.amount = new_amount
-                expense.save()
-                bill_report_lines.append(f"📈 {expense.name} rose to ₹{new_amount} (+{(expense.inflation_rate * 100):.0f}%)")
+        if apply_inflation:
+            inflated = list(session.expenses.filter(is_cancelled=False, inflation_rate__gt=0))
+            GameService._track_expenses(session, inflated, sign=-1)
+            for expense in inflated:
+                expense.amount = int(expense.amount * (1 + expense.inflation_rate))
+                bill_report_lines.append(f"📈 {expense.name} rose to ₹{expense.amount} (+{(expense.inflation_rate * 100):.0f}%)")
+            RecurringExpense.objects.bulk_update(inflated, ['amount'])
+            GameService._track_expenses(session, inflated)
 
-            total_monthly_drain += expense.amount
+        total_monthly_drain = session.recurring_expenses
 
         session.wealth -= total_monthly_drain
-        session.recurring_expenses = total_monthly_drain
 
         report_lines.append(f"-₹{total_monthly_drain} Total Bills Paid.")
         if bill_report_lines:
@@ -459,6 +423,16 @@ class GameService:
         if market_changes:
             report_lines.append(f"Market Update: {', '.join(market_changes)}")
 
+        # 4.2. Futures Settlement
+        settlement = GameEngine.settle_futures(session)
+        if settlement:
+            summary = (
+                f"{settlement['contracts']} futures contract(s) matured, {settlement['successful']} beat the market "
+                f"(hedge P&L ₹{settlement['hedge_pnl']:+,})."
+            )
+            report_lines.append(f"📑 {summary}")
+            GameService._append_gameplay_log(session, f"Month {session.current_month}: {summary}")
+
         # 4.5. IPO Listings
         updated_ipos = []
         for ipo in session.active_ipos:
@@ -486,6 +460,7 @@ class GameService:
                 profit = total_credit - invested
 
                 session.wealth += int(total_credit)
+                GameEngine._adjust_valuation(session, -invested)
 
                 if allotment_ratio == 0:
                     status_msg = "No allotment (Refunded)."
@@ -565,7 +540,7 @@ class GameService:
             session.credit_score -= 50
             session.happiness += 5
 
-            RecurringExpense.objects.create(
+            loan = RecurringExpense.objects.create(
                 session=session,
                 name="High Interest Loan",
                 amount=500,
@@ -574,6 +549,7 @@ class GameService:
                 inflation_rate=0.0,
                 started_month=session.current_month
             )
+            GameService._track_expenses(session, [loan])
             msg = f"Loan approved: ₹{amount}. Credit score dropped. Monthly interest added."
         else:
             return {'error': "Invalid loan type"}
@@ -607,6 +583,52 @@ class GameService:
         else:
             session.gameplay_log = entry
 
+    @staticmethod
+    def _track_expenses(session, expenses, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) expenses' amounts in the session's
+        cash-flow counters. A saved session is updated in the database with
+        F() expressions and the fresh totals read back, so changes made
+        through other instances aren't lost; an unsaved one in memory.
+        """
+        deltas = {'recurring_expenses': 0, 'essential_expenses': 0, 'debt_emi': 0}
+        for expense in expenses:
+            amount = sign * expense.amount
+            deltas['recurring_expenses'] += amount
+            if expense.is_essential:
+                deltas['essential_expenses'] += amount
+            if expense.category == 'DEBT':
+                deltas['debt_emi'] += amount
+
+        if session.pk is None:
+            for field, delta in deltas.items():
+                setattr(session, field, getattr(session, field) + delta)
+            return
+        GameSession.objects.filter(pk=session.pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
+        session.refresh_from_db(fields=list(deltas))
+
+    @staticmethod
+    def _refresh_income(session_id, session=None):
+        """
+        Recompute a session's income counters from its IncomeSource rows.
+        Pass the caller's `session` instance too, to keep it in step.
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        totals = IncomeSource.objects.filter(session_id=session_id).aggregate(
+            sources=Count('id'),
+            expected=Sum('amount_base'),
+            freelance=Sum('amount_base', filter=Q(source_type=IncomeSource.SourceType.FREELANCE)),
+        )
+        counters = {
+            'expected_income': (totals['expected'] or 0) if totals['sources'] else CONFIG['MONTHLY_SALARY'],
+            'freelance_income': totals['freelance'] or 0,
+            'income_source_count': totals['sources'],
+        }
+        GameSession.objects.filter(pk=session_id).update(**counters)
+        if session is not None:
+            for field, value in counters.items():
+                setattr(session, field, value)
+
     @staticmethod
     def _calculate_level(session):
         CONFIG = GameEngineConfig.CONFIG
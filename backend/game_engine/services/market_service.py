@@ -1,9 +1,25 @@
 """ Market, stock trading, mutual fund, and IPO logic. """
 import random
 import logging
-
-from ..models import RecurringExpense, StockHistory, FuturesContract
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .. import background
+from ..models import (
+    GameSession, RecurringExpense, StockHistory, FuturesContract, MarketTrajectory
+)
+from ..ml import client as forecast_client
+from ..ml.registry import has_model
+from ..ml.seed_windows import SeedWindowIndex
+from ..ml.simulator import MarketSimulator
+from ..ml.trajectory_bank import TrajectoryBank
 from .config import GameEngineConfig
+from .valuation_service import ValuationService
 
 logger = logging.getLogger(__name__)
 
@@ -24,42 +40,355 @@ class MarketService:
         changes = []
         new_month = session.current_month
 
-        histories = StockHistory.objects.filter(session=session, month=new_month)
-
-        for record in histories:
-            old_price = session.market_prices.get(record.sector, 0)
-            new_price = record.price
+        trajectory = MarketService._ensure_market_horizon(session)
+        fund_returns = trajectory.fund_returns if trajectory else {}
+        month_prices = MarketService._sector_prices_at(session, new_month, trajectory)
 
-            session.market_prices[record.sector] = new_price
+        for sector, new_price in month_prices.items():
+            old_price = session.market_prices.get(sector, 0)
 
             if old_price > 0:
                 pct_change = ((new_price - old_price) / old_price) * 100
                 if abs(pct_change) > 5:
                     direction = "surged" if pct_change > 0 else "tanked"
-                    changes.append(f"{record.sector.title()} {direction} {abs(pct_change):.1f}%")
+                    changes.append(f"{sector.title()} {direction} {abs(pct_change):.1f}%")
 
         # Update Mutual Fund NAVs
+        new_navs = {}
         for mf_key, mf_data in CONFIG['MUTUAL_FUNDS'].items():
             key = f"MF_{mf_key}"
             old_nav = session.market_prices.get(key, 100)
 
-            vol = mf_data['volatility']
-            change_pct = random.gauss(0.008, vol)
+            series = fund_returns.get(key, [])
+            change_pct = series[new_month - 1] if new_month <= len(series) else None
+            if change_pct is None:
+                # Sessions generated before fund paths were simulated
+                change_pct = random.gauss(0.008, mf_data['volatility'])
 
             new_nav = old_nav * (1 + change_pct)
-            session.market_prices[key] = max(10, new_nav)
+            new_navs[key] = max(10, new_nav)
 
             if change_pct < -0.05:
                 changes.append(f"{mf_data['name']} dropped {abs(change_pct * 100):.1f}%")
 
+        ValuationService._apply_prices(session, {**month_prices, **new_navs})
         return changes
 
+    @staticmethod
+    def _sector_prices_at(session, month, trajectory=None):
+        """{sector: price} for one month of a session's market history."""
+        if trajectory is None:
+            trajectory = MarketTrajectory.objects.filter(session=session).only('prices').first()
+        if trajectory is not None and trajectory.prices:
+            return trajectory.prices_at(month)
+        # Sessions from before packed history
+        return dict(StockHistory.objects.filter(session=session, month=month).values_list('sector', 'price'))
+
+    # ================= MARKET HISTORY GENERATION =================
+    @staticmethod
+    def init_market_history(session):
+        """
+        Seed the session's price generators and generate the first chunk
+        of market history, stored with the trajectory in a single insert.
+        Later chunks are produced lazily as the game advances.
+        Returns month-1 prices per sector.
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        trajectory = MarketTrajectory(
+            session=session, state=MarketService._initial_market_state(), seed=random.getrandbits(63)
+        )
+
+        # A bank row costs nothing to read, so store the whole horizon at once
+        from_bank = all(generator['engine'] == 'bank' for generator in trajectory.state.values())
+        months = CONFIG['GAME_DURATION_MONTHS'] if from_bank else CONFIG['MARKET_CHUNK_MONTHS']
+        months = min(months, CONFIG['GAME_DURATION_MONTHS'])
+
+        prices, fund_returns, trajectory.state = MarketService._generate_market_chunk(trajectory, 0, months)
+        trajectory.horizon = months
+        trajectory.prices = prices
+        trajectory.fund_returns = fund_returns
+        # Only the insert is transactional; the rollout above holds no locks
+        with transaction.atomic():
+            trajectory.save()
+        return {sector: series[0] for sector, series in prices.items()}
+
+    @staticmethod
+    def open_market(session_id):
+        """
+        Generate a new session's opening market history (the background
+        half of start_new_session). Runs at most once per session: the
+        trajectory's unique session key decides between racing callers.
+        """
+        session = GameSession.objects.filter(id=session_id).first()
+        if session is None or MarketTrajectory.objects.filter(session_id=session_id).exists():
+            return
+        try:
+            MarketService.init_market_history(session)
+        except IntegrityError:
+            pass  # Opened concurrently by a request that stopped waiting
+
+    @staticmethod
+    def ensure_market_ready(session, wait=True):
+        """
+        Move a new session onto its real opening prices once open_market
+        has stored them. Returns whether the market is ready.
+
+        With `wait`, blocks up to MARKET_READY_WAIT seconds for the
+        background job and then opens the market inline. Without it,
+        returns False straight away if the job hasn't landed.
+        """
+        if session.market_ready:
+            return True
+
+        def load():
+            return MarketTrajectory.objects.filter(session=session).only('prices').first()
+
+        trajectory = load()
+        if trajectory is None and wait:
+            deadline = time.monotonic() + settings.MARKET_READY_WAIT
+            while trajectory is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+                trajectory = load()
+            if trajectory is None:
+                logger.warning("Market for session %s not ready after %ss; opening inline.",
+                               session.id, settings.MARKET_READY_WAIT)
+                try:
+                    MarketService.open_market(session.id)
+                except Exception:
+                    logger.exception("Opening market for session %s failed", session.id)
+                trajectory = load()
+        if trajectory is None:
+            return False
+
+        ValuationService._apply_prices(session, trajectory.prices_at(session.current_month))
+        session.market_ready = True
+        session.save(update_fields=['market_prices', 'portfolio_value', 'market_ready', 'updated_at'])
+        return True
+
+    @staticmethod
+    def extend_market_history(session_id, months=None):
+        """
+        Generate the next chunk of market history for a session, continuing
+        from the generator state left by the previous chunk.
+
+        Safe to race (request thread vs background worker): the horizon is
+        claimed with a compare-and-swap, so each chunk is written once.
+        Returns the new prices per sector, or None if there was nothing to
+        do or another caller got there first.
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        trajectory = MarketTrajectory.objects.filter(session_id=session_id).first()
+        if trajectory is None:
+            return None
+
+        start = trajectory.horizon
+        months = min(months or CONFIG['MARKET_CHUNK_MONTHS'], CONFIG['GAME_DURATION_MONTHS'] - start)
+        if months <= 0:
+            return None
+
+        prices, fund_moves, state = MarketService._generate_market_chunk(trajectory, start, months)
+
+        # Packed series were read together with `horizon`, so appending is safe under the claim
+        packed_prices = {
+            sector: trajectory.prices.get(sector, []) + series for sector, series in prices.items()
+        }
+        fund_returns = {}
+        for key, moves in fund_moves.items():
+            series = trajectory.fund_returns.get(key, [])
+            # Pad months generated before fund paths existed
+            fund_returns[key] = series + [None] * (start - len(series)) + moves
+
+        claimed = MarketTrajectory.objects.filter(pk=trajectory.pk, horizon=start).update(
+            horizon=start + months, state=state, prices=packed_prices, fund_returns=fund_returns,
+            updated_at=timezone.now()
+        )
+        if not claimed:
+            return None
+        return prices
+
+    @staticmethod
+    def market_history(session, since_month=0):
+        """
+        Columnar sector prices for months since_month+1..current month:
+        {'months': [...], 'tech': [...], ...}.
+
+        Months up to the current one never change, so the full history is
+        cached per (session, current month) and incremental requests are
+        sliced from it. Nothing is cached until the session's market has
+        opened, so an early request can't pin an empty history.
+        """
+        key = f"market-history:{session.id}:{session.current_month}"
+        history = cache.get(key)
+        if history is None:
+            history, from_trajectory = MarketService._load_market_history(session)
+            if session.market_ready and from_trajectory:
+                cache.set(key, history, settings.MARKET_HISTORY_CACHE_TIMEOUT)
+
+        if since_month <= 0:
+            return history
+        skip = sum(1 for month in history['months'] if month <= since_month)
+        return {column: values[skip:] for column, values in history.items()}
+
+    @staticmethod
+    def _load_market_history(session):
+        """(columnar history, whether it came from the session's MarketTrajectory)."""
+        through_month = session.current_month
+        trajectory = MarketTrajectory.objects.filter(session=session).only('prices').first()
+        if trajectory is not None and trajectory.prices:
+            return trajectory.price_history(through_month), True
+
+        # Sessions from before packed history
+        rows = StockHistory.objects.filter(
+            session=session, month__lte=through_month
+        ).order_by('month').values_list('sector', 'month', 'price')
+        by_month = {}
+        for sector, month, price in rows:
+            by_month.setdefault(month, {})[sector] = price
+        sectors = sorted({sector for prices in by_month.values() for sector in prices})
+        history = {'months': sorted(by_month)}
+        for sector in sectors:
+            history[sector] = [by_month[month].get(sector) for month in history['months']]
+        return history, False
+
+    @staticmethod
+    def _ensure_market_horizon(session):
+        """
+        Make sure the current month has market prices, and schedule the
+        next chunk in the background when the session nears its horizon.
+        Returns the session's MarketTrajectory (None for sessions without one).
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        month = session.current_month
+
+        trajectory = MarketTrajectory.objects.filter(session=session).only('horizon', 'prices', 'fund_returns').first()
+        if trajectory is None or month > CONFIG['GAME_DURATION_MONTHS']:
+            return trajectory
+
+        if trajectory.horizon < month:
+            # Background chunk hasn't landed yet; generate inline so this month has real prices
+            MarketService.extend_market_history(
+                session.id, months=max(CONFIG['MARKET_CHUNK_MONTHS'], month - trajectory.horizon)
+            )
+            trajectory.refresh_from_db(fields=['horizon', 'prices', 'fund_returns'])
+        elif (
+            trajectory.horizon - month < CONFIG['MARKET_PREFETCH_MONTHS']
+            and trajectory.horizon < CONFIG['GAME_DURATION_MONTHS']
+        ):
+            background.submit(
+                MarketService.extend_market_history, session.id,
+                key=f"market-history:{session.id}",
+            )
+
+        return trajectory
+
+    @staticmethod
+    def _initial_market_state():
+        """Build per-sector generator state for a new session."""
+        CONFIG = GameEngineConfig.CONFIG
+
+        bank = TrajectoryBank.load()
+        if bank is not None and bank.covers(CONFIG['STOCK_SECTORS'], CONFIG['GAME_DURATION_MONTHS']):
+            row = random.randrange(bank.count)
+            return {
+                sector: {'engine': 'bank', 'bank': bank.bank_id, 'row': row}
+                for sector in CONFIG['STOCK_SECTORS']
+            }
+
+        state = {}
+        for sector in CONFIG['STOCK_SECTORS']:
+            price = CONFIG['SECTOR_START_PRICES'].get(sector, 100)
+            ticker = CONFIG['SECTOR_MODELS'].get(sector)
+            if not ticker or not has_model(ticker):
+                state[sector] = {'engine': 'gbm', 'price': price}
+                continue
+
+            # Random historical window (O(1) from the per-worker index), or the latest one
+            index = SeedWindowIndex.for_ticker(f'{ticker}.NS')
+            if settings.MARKET_SEED_WINDOW == 'latest':
+                window = index.latest_window()
+            else:
+                window = index.random_window()
+
+            if window is None:
+                logger.warning("Insufficient seed data for %s. Using fallback simulation.", ticker)
+                state[sector] = {'engine': 'flat', 'price': price}
+                continue
+
+            seed_rows = window.tolist()
+            if settings.STOCK_FORECAST_CACHE and settings.MARKET_SEED_WINDOW == 'latest':
+                # Shared, cached model path; `price` tracks this session's chaos on top of it.
+                # Random windows almost never repeat, so they keep the per-session rollout
+                state[sector] = {
+                    'engine': 'lstm_cached', 'ticker': ticker,
+                    'context': seed_rows, 'price': seed_rows[-1][0],
+                }
+            else:
+                state[sector] = {'engine': 'lstm', 'ticker': ticker, 'context': seed_rows}
+        return state
+
+    @staticmethod
+    def _generate_market_chunk(trajectory, start, months):
+        """
+        Run every generator forward from month `start`.
+        All simulated assets (GBM sectors and fund NAVs) come from one
+        correlated draw seeded by (session seed, start month).
+        Returns (sector prices, fund NAV returns, new state).
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        simulator = MarketSimulator.from_config(CONFIG)
+        seed = trajectory.seed if trajectory.seed is not None else trajectory.session_id
+        simulated = simulator.returns(months, rng=[seed, start])
+
+        prices = {}
+        new_state = {}
+
+        for sector, generator in trajectory.state.items():
+            generator = dict(generator)
+
+            if generator['engine'] == 'bank':
+                bank = TrajectoryBank.load()
+                if bank is None or bank.bank_id != generator['bank']:
+                    # Bank was rebuilt or removed mid-game; continue from the last price
+                    generator = {'engine': 'gbm', 'price': generator.get('price', 100)}
+
+            if generator['engine'] == 'bank':
+                series = bank.series(generator['row'], sector, start, months)
+                generator['price'] = series[-1]
+            elif generator['engine'] == 'lstm':
+                # Model server (or in-process batcher); batched with concurrent sessions
+                series, context = forecast_client.forecast(generator['ticker'], generator['context'], months)
+                generator['context'] = context.tolist()
+            elif generator['engine'] == 'lstm_cached':
+                series, context, generator['price'] = forecast_client.cached_forecast(
+                    generator['ticker'], generator['context'], generator['price'], months,
+                    rng=[seed, start, 1],  # own stream, independent of the simulator draw
+                )
+                generator['context'] = context.tolist()
+            elif generator['engine'] == 'gbm':
+                path = generator['price'] * np.cumprod(1 + simulated[:, simulator.column(sector)])
+                series = [int(p) for p in path]
+                generator['price'] = float(path[-1])
+            else:
+                series = [generator['price']] * months
+
+            prices[sector] = series
+            new_state[sector] = generator
+
+        fund_returns = {
+            f"MF_{fund_key}": simulated[:, simulator.column(f"MF_{fund_key}")].tolist()
+            for fund_key in CONFIG['MUTUAL_FUNDS']
+        }
+
+        return prices, fund_returns, new_state
+
     # ================= STOCK TRADING =================
     @staticmethod
-    def buy_stock(session, sector, amount):
+    def buy_stock(session, sector, amount, save=True):
         """Buy stocks in a specific sector."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
+        if not MarketService.ensure_market_ready(session):
+            return {'error': "The market is still opening. Try again in a moment."}
 
         GameService._refresh_level(session)
         if session.current_level < CONFIG['LEVEL_UNLOCKS']['investing']:
@@ -84,15 +413,11 @@ class MarketService:
 
         session.wealth -= amount
         session.portfolio[sector] = session.portfolio.get(sector, 0) + units
+        ValuationService._adjust_valuation(session, amount)
+        ValuationService._record_buy(session, sector, units, amount)
 
-        session.purchase_history.append({
-            "sector": sector,
-            "units": units,
-            "price": current_price,
-            "month": session.current_month
-        })
-
-        session.save()
+        if save:
+            session.save()
 
         return {
             'session': session,
@@ -100,9 +425,11 @@ class MarketService:
         }
 
     @staticmethod
-    def sell_stock(session, sector, amount):
+    def sell_stock(session, sector, amount, save=True):
         """Sell stocks. `amount` refers to UNITS to sell."""
         CONFIG = GameEngineConfig.CONFIG
+        if not MarketService.ensure_market_ready(session):
+            return {'error': "The market is still opening. Try again in a moment."}
         if sector not in CONFIG['STOCK_SECTORS']:
             return {'error': "Invalid sector."}
 
@@ -120,7 +447,10 @@ class MarketService:
 
         session.wealth += int(cash_value)
         session.portfolio[sector] = current_owned - units_to_sell
-        session.save()
+        ValuationService._adjust_valuation(session, -cash_value)
+        ValuationService._record_sale(session, sector, units_to_sell, int(cash_value))
+        if save:
+            session.save()
 
         return {
             'session': session,
@@ -132,6 +462,8 @@ class MarketService:
         """Executes a Futures Contract sale."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
+        if not MarketService.ensure_market_ready(session):
+            return {'error': "The market is still opening. Try again in a moment."}
 
         GameService._refresh_level(session)
         if session.current_level < CONFIG['LEVEL_UNLOCKS']['mastery']:
@@ -153,6 +485,8 @@ class MarketService:
 
         session.wealth += int(total_payout)
         session.portfolio[sector] = current_owned - units
+        ValuationService._adjust_valuation(session, -units * current_price)
+        ValuationService._record_sale(session, sector, units, int(total_payout))
 
         FuturesContract.objects.create(
             session=session,
@@ -161,7 +495,8 @@ class MarketService:
             strike_price=contract_price,
             spot_price_at_sale=current_price,
             duration_months=duration,
-            created_month=session.current_month
+            created_month=session.current_month,
+            maturity_month=session.current_month + duration
         )
 
         session.save()
@@ -171,9 +506,44 @@ class MarketService:
             'session': session
         }
 
+    @staticmethod
+    def settle_futures(session, final=False):
+        """
+        Settle the contracts maturing this month at the current market
+        price, in one bulk update. With `final` (game over), every contract
+        still open is settled at the current prices. Returns the settlement
+        summary, or None if nothing was settled.
+        """
+        contracts = FuturesContract.objects.filter(session=session, final_market_price__isnull=True)
+        if not final:
+            contracts = contracts.filter(maturity_month=session.current_month)
+        contracts = list(contracts)
+        if not contracts:
+            return None
+
+        summary = MarketService._settle_contracts(contracts, session.market_prices)
+        FuturesContract.objects.bulk_update(contracts, ['final_market_price', 'is_successful'])
+        return summary
+
+    @staticmethod
+    def _settle_contracts(contracts, prices):
+        """
+        Fill in final_market_price / is_successful from {sector: price}
+        (unsaved). A contract succeeded if its strike beat the market price
+        at maturity; hedge_pnl is what selling forward earned over holding.
+        """
+        summary = {'contracts': len(contracts), 'successful': 0, 'hedge_pnl': 0}
+        for contract in contracts:
+            final_price = int(prices.get(contract.sector, contract.spot_price_at_sale))
+            contract.final_market_price = final_price
+            contract.is_successful = contract.strike_price > final_price
+            summary['successful'] += contract.is_successful
+            summary['hedge_pnl'] += int((contract.strike_price - final_price) * contract.units)
+        return summary
+
     # ================= MUTUAL FUNDS & IPOs =================
     @staticmethod
-    def buy_mutual_fund(session, fund_type, amount):
+    def buy_mutual_fund(session, fund_type, amount, save=True):
         """Invest in a Mutual Fund."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
@@ -202,7 +572,9 @@ class MarketService:
 
         session.mutual_funds[fund_type] = current_data
         session.wealth -= amount
-        session.save()
+        ValuationService._adjust_valuation(session, amount)
+        if save:
+            session.save()
 
         return {
             'session': session,
@@ -210,7 +582,7 @@ class MarketService:
         }
 
     @staticmethod
-    def sell_mutual_fund(session, fund_type, units):
+    def sell_mutual_fund(session, fund_type, units, save=True):
         """Redeem Mutual Fund units."""
         if fund_type not in session.mutual_funds:
             return {'error': "You don't own this fund."}
@@ -226,17 +598,20 @@ class MarketService:
 
         session.wealth += int(redemption_value)
         current_data['units'] -= units
+        ValuationService._adjust_valuation(session, -redemption_value)
 
         original_units = current_data['units'] + units
         if original_units > 0:
             current_data['invested'] = current_data['invested'] * (current_data['units'] / original_units)
 
         if current_data['units'] < 0.01:
+            ValuationService._adjust_valuation(session, -current_data['units'] * nav)
             del session.mutual_funds[fund_type]
         else:
             session.mutual_funds[fund_type] = current_data
 
-        session.save()
+        if save:
+            session.save()
 
         return {
             'session': session,
@@ -244,7 +619,7 @@ class MarketService:
         }
 
     @staticmethod
-    def apply_for_ipo(session, ipo_name, amount):
+    def apply_for_ipo(session, ipo_name, amount, save=True):
         """Apply for an IPO."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
@@ -278,15 +653,90 @@ class MarketService:
                 return {'error': "Already applied for this IPO."}
 
         session.wealth -= amount
+        ValuationService._adjust_valuation(session, amount)
         session.active_ipos.append({
             "name": ipo_name,
             "amount": amount,
             "status": "APPLIED",
             "month": session.current_month
         })
-        session.save()
+        if save:
+            session.save()
 
         return {
             'session': session,
             'message': f"Applied for {ipo_name} IPO (₹{amount}). Allocation next month."
         }
+
+    # ================= BATCH ORDERS =================
+    @staticmethod
+    def execute_orders(session, orders):
+        """
+        Apply a list of orders all-or-nothing, with one session save.
+
+        Orders run in sequence against the running session state (cash,
+        holdings, level unlocks), e.g.
+        [{"type": "sell_stock", "sector": "gold", "units": 2},
+         {"type": "buy_stock", "sector": "tech", "amount": 5000},
+         {"type": "buy_mutual_fund", "fund_type": "NIFTY50", "amount": 1000},
+         {"type": "sell_mutual_fund", "fund_type": "NIFTY50", "units": 3.5},
+         {"type": "apply_ipo", "ipo_name": "Zomato", "amount": 15000}].
+        If any order fails, nothing is saved.
+
+        Returns {'session', 'results'} or {'error', 'results'}; results
+        has one {'type', 'ok', 'message' | 'error'} per order.
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        handlers = {
+            'buy_stock': lambda o: MarketService.buy_stock(
+                session, str(o.get('sector', '')).lower(), int(o.get('amount', 0)), save=False),
+            'sell_stock': lambda o: MarketService.sell_stock(
+                session, str(o.get('sector', '')).lower(), o.get('units', 0), save=False),
+            'buy_mutual_fund': lambda o: MarketService.buy_mutual_fund(
+                session, o.get('fund_type'), int(o.get('amount', 0)), save=False),
+            'sell_mutual_fund': lambda o: MarketService.sell_mutual_fund(
+                session, o.get('fund_type'), float(o.get('units', 0)), save=False),
+            'apply_ipo': lambda o: MarketService.apply_for_ipo(
+                session, o.get('ipo_name'), int(o.get('amount', 0)), save=False),
+        }
+
+        if not isinstance(orders, list) or not orders:
+            return {'error': "orders must be a non-empty list.", 'results': []}
+        if len(orders) > CONFIG['MAX_BATCH_ORDERS']:
+            return {'error': f"At most {CONFIG['MAX_BATCH_ORDERS']} orders per batch.", 'results': []}
+        if not MarketService.ensure_market_ready(session):
+            return {'error': "The market is still opening. Try again in a moment.", 'results': []}
+
+        with transaction.atomic():
+            # Hold the row so a concurrent request can't interleave with the batch
+            GameSession.objects.select_for_update().filter(pk=session.pk).exists()
+            session.refresh_from_db()
+
+            results = []
+            failure = None
+            for i, order in enumerate(orders):
+                order_type = order.get('type') if isinstance(order, dict) else None
+                if failure is not None:
+                    results.append({'type': order_type, 'ok': False, 'error': "Not executed."})
+                    continue
+
+                handler = handlers.get(order_type)
+                try:
+                    result = handler(order) if handler else {'error': f"Unknown order type {order_type!r}."}
+                except (ValueError, TypeError):
+                    result = {'error': "Invalid amount."}
+
+                if 'error' in result:
+                    failure = f"Order {i + 1} ({order_type}) failed: {result['error']} No orders were applied."
+                    results.append({'type': order_type, 'ok': False, 'error': result['error']})
+                else:
+                    results.append({'type': order_type, 'ok': True, 'message': result['message']})
+
+            if failure is not None:
+                # Discard the partial in-memory changes; nothing was written
+                session.refresh_from_db()
+                return {'error': failure, 'results': results}
+
+            session.save()
+
+        return {'session': session, 'results': results}
@@ -4,7 +4,7 @@ Persona generation, game-over finalization, and history recording.
 import os
 import logging
 
-from ..models import GameHistory, PlayerProfile
+from ..models import FuturesContract, GameHistory, PlayerProfile
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE
 from .config import GameEngineConfig, REPORT_PROMPT_TEMPLATE
 
@@ -30,6 +30,16 @@ class ReportService:
         from . import GameEngine
 
         session.is_active = False
+
+        # Contracts maturing after the last month played settle at the final prices
+        settlement = GameEngine.settle_futures(session, final=True)
+        if settlement:
+            GameEngine._append_gameplay_log(
+                session,
+                f"Game over: {settlement['contracts']} open futures contract(s) settled at final prices, "
+                f"{settlement['successful']} beat the market (hedge P&L ₹{settlement['hedge_pnl']:+,})."
+            )
+
         if not session.final_report:
             session.final_report = ReportService._generate_final_report(session, reason)
         session.save()
@@ -38,15 +48,21 @@ class ReportService:
     @staticmethod
     def _generate_final_report(session, reason):
         """Build an end-of-game report, optionally using Gemini."""
-        portfolio_value = 0
+        from . import GameEngine
+
+        portfolio_value = int(session.portfolio_value)
         portfolio_lines = []
-        if session.portfolio and session.market_prices:
-            for sector, units in session.portfolio.items():
-                price = session.market_prices.get(sector, 100)
-                value = int(units * price)
-                portfolio_value += value
-                if units:
-                    portfolio_lines.append(f"{sector.title()}: {units:.2f} units @ ₹{price} (₹{value})")
+        for item in GameEngine.holdings(session):
+            if item['kind'] == 'ipo':
+                portfolio_lines.append(f"{item['name']} IPO application (₹{item['value']})")
+            elif item['units']:
+                portfolio_lines.append(
+                    f"{item['name'].title()}: {item['units']:.2f} units @ ₹{item['price']:.0f} (₹{item['value']})"
+                )
+        futures = FuturesContract.objects.filter(session=session, final_market_price__isnull=False)
+        hedge_pnl = sum(int((c.strike_price - c.final_market_price) * c.units) for c in futures)
+        if futures:
+            portfolio_lines.append(f"Futures hedge P&L ₹{hedge_pnl:+,} over {len(futures)} contract(s)")
         portfolio_breakdown = "; ".join(portfolio_lines) if portfolio_lines else "No active holdings."
         gameplay_log = session.gameplay_log or "No gameplay log recorded."
 
@@ -100,12 +116,6 @@ class ReportService:
 
         persona_data = GameEngine.generate_persona(session)
         if session.user:
-            portfolio_value = 0
-            if session.portfolio and session.market_prices:
-                for sector, units in session.portfolio.items():
-                    price = session.market_prices.get(sector, 100)
-                    portfolio_value += int(units * price)
-
             GameHistory.objects.create(
                 user=session.user,
                 final_wealth=session.wealth,
@@ -118,11 +128,12 @@ class ReportService:
             )
             profile, _ = PlayerProfile.objects.get_or_create(user=session.user)
             profile.total_games += 1
-            profile.highest_wealth = max(profile.highest_wealth, session.wealth + portfolio_value)
+            profile.highest_wealth = max(profile.highest_wealth, GameEngine.net_worth(session))
             profile.highest_score = max(profile.highest_score, session.financial_literacy)
             profile.highest_credit_score = max(profile.highest_credit_score, session.credit_score)
             profile.highest_happiness = max(profile.highest_happiness, session.happiness)
-            profile.highest_stock_profit = max(profile.highest_stock_profit, portfolio_value)
+            pnl = GameEngine.profit_and_loss(session)
+            profile.highest_stock_profit = max(profile.highest_stock_profit, int(pnl['realized'] + pnl['unrealized']))
             profile.save()
 
     @staticmethod
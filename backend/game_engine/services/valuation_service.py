@@ -0,0 +1,118 @@
+"""
+Portfolio valuation.
+
+`session.portfolio_value` holds the market value of everything the
+player owns besides cash: stock units, mutual fund units and IPO
+applications still awaiting allotment (at cost). It is kept current
+incrementally - trades add or remove value, price moves reprice the
+units held - so readers never loop over holdings.
+
+`session.cost_basis` is the stock ledger: one average-cost position
+per sector, {"tech": {"units": 12.5, "cost": 6100.0, "realized": 350.0}},
+updated in O(1) per trade, from which P&L is read without any history.
+"""
+from .config import GameEngineConfig
+
+
+class ValuationService:
+    """Net worth and holdings valuation for a session."""
+
+    @staticmethod
+    def net_worth(session):
+        """Cash plus portfolio value."""
+        return session.wealth + int(session.portfolio_value)
+
+    @staticmethod
+    def _adjust_valuation(session, delta):
+        """A trade moved `delta` rupees of value into (+) or out of (-) the portfolio."""
+        session.portfolio_value = max(0.0, session.portfolio_value + delta)
+
+    @staticmethod
+    def _apply_prices(session, prices):
+        """
+        Set market_prices (sectors and MF_<fund> NAVs) and reprice the
+        units held at them.
+        """
+        delta = 0.0
+        for key, new_price in prices.items():
+            units = ValuationService._units_held(session, key)
+            if units:
+                delta += units * (new_price - session.market_prices.get(key, new_price))
+            session.market_prices[key] = new_price
+        session.portfolio_value = max(0.0, session.portfolio_value + delta)
+
+    @staticmethod
+    def _units_held(session, price_key):
+        if price_key.startswith('MF_'):
+            return session.mutual_funds.get(price_key[3:], {}).get('units', 0)
+        return session.portfolio.get(price_key, 0)
+
+    @staticmethod
+    def holdings(session):
+        """
+        Itemised valuation, recomputed from the holdings:
+        [{'kind': 'stock' | 'mutual_fund' | 'ipo', 'name', 'units', 'price', 'value'}, ...]
+        """
+        CONFIG = GameEngineConfig.CONFIG
+        items = []
+        for sector in CONFIG['STOCK_SECTORS']:
+            units = session.portfolio.get(sector, 0)
+            price = session.market_prices.get(sector, 100)
+            items.append({'kind': 'stock', 'name': sector, 'units': units, 'price': price, 'value': int(units * price)})
+        for fund_type, data in session.mutual_funds.items():
+            nav = session.market_prices.get(f"MF_{fund_type}", 100)
+            items.append({
+                'kind': 'mutual_fund', 'name': fund_type, 'units': data['units'], 'price': nav,
+                'value': int(data['units'] * nav),
+            })
+        for ipo in session.active_ipos:
+            if ipo['status'] == 'APPLIED':
+                items.append({'kind': 'ipo', 'name': ipo['name'], 'units': None, 'price': None, 'value': ipo['amount']})
+        return items
+
+    @staticmethod
+    def revalue(session):
+        """Recompute portfolio_value from scratch (backfills, drift checks)."""
+        session.portfolio_value = float(sum(item['value'] for item in ValuationService.holdings(session)))
+        return session.portfolio_value
+
+    @staticmethod
+    def _record_buy(session, sector, units, cost):
+        """Add a purchase to the sector's average-cost position."""
+        position = session.cost_basis.setdefault(sector, {'units': 0.0, 'cost': 0.0, 'realized': 0.0})
+        position['units'] += units
+        position['cost'] += cost
+
+    @staticmethod
+    def _record_sale(session, sector, units, proceeds):
+        """Take `units` out of the position at average cost. Returns the realized P&L."""
+        position = session.cost_basis.setdefault(sector, {'units': 0.0, 'cost': 0.0, 'realized': 0.0})
+        held = position['units']
+        cost = position['cost'] * min(units / held, 1.0) if held > 0 else 0.0
+        position['units'] = max(0.0, held - units)
+        position['cost'] = position['cost'] - cost if position['units'] > 1e-9 else 0.0
+        pnl = proceeds - cost
+        position['realized'] += pnl
+        return pnl
+
+    @staticmethod
+    def profit_and_loss(session):
+        """
+        Stock P&L from the cost basis ledger:
+        {'realized', 'unrealized', 'by_sector': {sector: {'units', 'avg_cost', 'realized', 'unrealized'}}}
+        """
+        by_sector = {}
+        for sector, position in session.cost_basis.items():
+            units = position['units']
+            price = session.market_prices.get(sector, 100)
+            by_sector[sector] = {
+                'units': round(units, 4),
+                'avg_cost': round(position['cost'] / units, 2) if units else 0.0,
+                'realized': round(position['realized'], 2),
+                'unrealized': round(units * price - position['cost'], 2),
+            }
+        return {
+            'realized': round(sum(p['realized'] for p in by_sector.values()), 2),
+            'unrealized': round(sum(p['unrealized'] for p in by_sector.values()), 2),
+            'by_sector': by_sector,
+        }
@@ -0,0 +1,18 @@
+"""
+Income sources are managed from the admin rather than the game flow, so
+the session's income counters (expected_income, freelance_income) are
+refreshed from their save/delete signals.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import IncomeSource
+
+
+@receiver(post_save, sender=IncomeSource)
+@receiver(post_delete, sender=IncomeSource)
+def refresh_income_counters(sender, instance, **kwargs):
+    from .services import GameEngine
+    # Keep the caller's session object (if it came with the source) in step
+    session = instance.session if IncomeSource.session.is_cached(instance) else None
+    GameEngine._refresh_income(instance.session_id, session)
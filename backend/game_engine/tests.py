@@ -0,0 +1,39 @@
+import random
+from unittest import skipUnless
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from .ml.market_data import FEATURES, derive_features
+from .ml.registry import has_model
+
+
+def synthetic_window(seed=7, start_price=900, rows=200):
+    """A (60, 5) seed window from a seeded random walk, indicators derived as in the CSV loader."""
+    rng = np.random.default_rng(seed)
+    columns = {feature: np.full(rows, np.nan) for feature in FEATURES}
+    columns['close'] = start_price * np.cumprod(1 + rng.normal(0.0005, 0.015, rows))
+    derive_features(columns)
+    return np.column_stack([columns[feature] for feature in FEATURES])[-60:]
+
+
+@skipUnless(has_model('RELIANCE'), "needs the trained RELIANCE model")
+class IncrementalForecastTests(SimpleTestCase):
+    """generate_forecast(incremental=True) must track the windowed rollout it replaced."""
+    MONTHS = 12
+    RTOL = 0.01
+
+    def test_incremental_matches_windowed_rollout(self):
+        from .ml.predictor import AIStockPredictor
+
+        predictor = AIStockPredictor('RELIANCE')
+        for seed in (0, 42, 2024):
+            with self.subTest(seed=seed):
+                window = synthetic_window(seed)
+                incremental = predictor.generate_forecast(
+                    window, months=self.MONTHS, incremental=True, rng=random.Random(seed)
+                )
+                windowed = predictor.generate_forecast(
+                    window, months=self.MONTHS, incremental=False, rng=random.Random(seed)
+                )
+                np.testing.assert_allclose(incremental, windowed, rtol=self.RTOL)
@@ -23,6 +23,7 @@ urlpatterns = [
     path('market-status/<int:session_id>/', views.market_status, name='market-status'),
     path('trade/futures/', views.trade_futures, name='trade-futures'),
     path('market/history/<int:session_id>/', views.get_market_history, name='market-history'),
+    path('market/orders/', views.place_orders, name='market-orders'),
     
     # Mutual Funds & IPOs
     path('market/mutual-fund/invest/', views.invest_mutual_fund, name='invest-mutual-fund'),
@@ -10,7 +10,7 @@ from django.core.exceptions import PermissionDenied
 from .models import (
     GameSession, ScenarioCard, Choice, PlayerChoice,
     PlayerProfile, GameHistory, MarketEvent, RecurringExpense,
-    StockHistory, FuturesContract
+    FuturesContract
 )
 from .serializers import (
     GameSessionSerializer, ScenarioCardSerializer, SubmitChoiceSerializer,
@@ -89,6 +89,9 @@ def get_card(request, session_id):
     # Get language from query parameter
     language = request.GET.get('lang', 'en')
 
+    # Pick up the opening prices if the background market job has finished
+    GameEngine.ensure_market_ready(session, wait=False)
+
     # Use GameEngine for smart selection
     card = GameEngine.get_next_card(session)
 
@@ -250,6 +253,7 @@ def get_session(request, session_id):
         )
 
     GameEngine.validate_ownership(request.user, session)
+    GameEngine.ensure_market_ready(session, wait=False)
 
     return Response({
         'session': GameSessionSerializer(session).data
@@ -381,14 +385,7 @@ def get_leaderboard(request):
 
     leaderboard = []
     for i, session in enumerate(top_sessions, 1):
-        # Calculate Portfolio Value
-        portfolio_val = 0
-        if session.portfolio and session.market_prices:
-             for sector, units in session.portfolio.items():
-                 price = session.market_prices.get(sector, 0)
-                 portfolio_val += (units * price)
-        
-        total_wealth = session.wealth + int(portfolio_val)
+        total_wealth = GameEngine.net_worth(session)
 
         # Calculate a composite score
         score = (
@@ -483,6 +480,39 @@ def sell_stock(request):
 
 
 
+@api_view(['POST'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def place_orders(request):
+    """
+    Apply several stock / mutual fund / IPO orders atomically, e.g. to
+    rebalance in one step. See MarketService.execute_orders for the
+    order format.
+    """
+    session_id = request.data.get('session_id')
+    orders = request.data.get('orders')
+
+    if not session_id:
+        return Response({'error': 'session_id is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        session = GameSession.objects.get(id=session_id, is_active=True)
+        GameEngine.validate_ownership(request.user, session)
+    except GameSession.DoesNotExist:
+        return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except PermissionDenied:
+        return Response({'error': 'Unauthorized.'}, status=status.HTTP_403_FORBIDDEN)
+
+    result = GameEngine.execute_orders(session, orders)
+    if 'error' in result:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'session': GameSessionSerializer(result['session']).data,
+        'results': result['results']
+    })
+
+
 @api_view(['GET'])
 @authentication_classes([FirebaseAuthentication])
 @permission_classes([IsAuthenticated])
@@ -493,30 +523,25 @@ def market_status(request, session_id):
     except GameSession.DoesNotExist:
         return Response({'error': 'Session not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Calculate portfolio value
-    portfolio_value = 0
-    holdings = []
-    
-    # Use canonical sector list from GameEngine config
-    stock_sectors = GameEngine.CONFIG['STOCK_SECTORS']
-    
-    for sector in stock_sectors:
-        units = session.portfolio.get(sector, 0)
-        price = session.market_prices.get(sector, 100)
-        value = int(units * price)
-        portfolio_value += value
-        holdings.append({
-            'sector': sector,
-            'units': round(units, 2),
-            'current_price': price,
-            'value': value
-        })
+    market_ready = GameEngine.ensure_market_ready(session, wait=False)
+
+    holdings = [
+        {
+            'sector': item['name'],
+            'units': round(item['units'], 2),
+            'current_price': item['price'],
+            'value': item['value']
+        }
+        for item in GameEngine.holdings(session) if item['kind'] == 'stock'
+    ]
 
     return Response({
         'market_prices': session.market_prices,
+        'market_ready': market_ready,
         'portfolio': holdings,
-        'total_portfolio_value': portfolio_value,
-        'net_worth': session.wealth + portfolio_value,
+        'total_portfolio_value': int(session.portfolio_value),
+        'net_worth': GameEngine.net_worth(session),
+        'profit_and_loss': GameEngine.profit_and_loss(session),
         'current_level': session.current_level,
         'mutual_funds': session.mutual_funds,
         'active_ipos': session.active_ipos
@@ -554,25 +579,26 @@ def trade_futures(request):
 @authentication_classes([FirebaseAuthentication])
 @permission_classes([IsAuthenticated])
 def get_market_history(request, session_id):
-    """Returns price history up to the CURRENT month for charts."""
+    """
+    Returns price history up to the CURRENT month for charts, columnar:
+    {"months": [1, 2, ...], "tech": [...], ...}.
+    `?since_month=N` returns only the months after N.
+    """
     try:
         session = GameSession.objects.get(id=session_id)
     except GameSession.DoesNotExist:
         return Response({'error': 'Session not found'}, status=404)
 
-    # Only fetch months that have happened (1 to current)
-    history = StockHistory.objects.filter(
-        session=session, 
-        month__lte=session.current_month
-    ).order_by('month')
-    
-    data = {}
-    for h in history:
-        if h.sector not in data:
-            data[h.sector] = []
-        data[h.sector].append({'month': h.month, 'price': h.price})
-        
-    return Response(data)
+    try:
+        since_month = int(request.query_params.get('since_month', 0))
+    except ValueError:
+        return Response({'error': 'since_month must be an integer.'}, status=400)
+
+    # A brand-new session's history is written by the background open_market job
+    GameEngine.ensure_market_ready(session)
+
+    # Only months that have happened (1 to current)
+    return Response(GameEngine.market_history(session, since_month=since_month))
 
 @api_view(['POST'])
 @authentication_classes([FirebaseAuthentication])